@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import contextlib
+import io
+import logging
+import urllib.request
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Add src to Python path
+sys.path.append(os.path.join(ROOT, 'src'))
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'results', 'benchmark_baseline.json')
+
+def measure(fn, iterations, warmup=3, inner=1):
+    """Run fn repeatedly and return ops/sec with p50/p99 latency in milliseconds
+    
+    Microsecond-scale functions are timed in groups of `inner` calls so timer
+    overhead does not dominate; latencies are then per call within a group.
+    """
+    for _ in range(warmup * inner):
+        fn()
+    
+    latencies = np.empty(iterations)
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        latencies[i] = (time.perf_counter() - t0) / inner
+    elapsed = time.perf_counter() - start
+    
+    return summarize(latencies, iterations * inner, elapsed)
+
+def summarize(latencies, operations, elapsed):
+    return {
+        'ops_per_sec': operations / elapsed if elapsed > 0 else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000)
+    }
+
+def bench_detector(weights=None, latency=0.0):
+    from vehicle_detector import VehicleDetector
+    from stub_model import StubYOLO
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        if weights:
+            detector = VehicleDetector(weights)
+        else:
+            detector = VehicleDetector(model_path='stub', model=StubYOLO(latency=latency))
+    
+    image_dir = os.path.join(ROOT, 'data', '0')
+    images = [os.path.join(image_dir, f) for f in sorted(os.listdir(image_dir)) if f.endswith('.jpg')]
+    image_iter = iter(range(10 ** 9))
+    
+    def single():
+        detector.detect_vehicles(images[next(image_iter) % len(images)])
+    
+    results = {'detector.detect_vehicles': measure(single, 50)}
+    
+    batch = measure(lambda: detector.detect_many(images, batch_size=len(images)), 10)
+    # Report the batch path per image so it is comparable with detect_vehicles
+    batch['ops_per_sec'] *= len(images)
+    batch['p50_ms'] /= len(images)
+    batch['p99_ms'] /= len(images)
+    results['detector.detect_many_per_image'] = batch
+    return results
+
+def bench_controller(iterations=2000):
+    from signal_controller import TrafficSignalController
+    from split_optimizer import SplitOptimizer
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = TrafficSignalController()
+        optimized = TrafficSignalController(split_optimizer=SplitOptimizer())
+    
+    rng = random.Random(0)
+    scenarios = [{f'camera_{i}': rng.randint(0, 40) for i in range(1, 5)} for _ in range(256)]
+    sequences = [controller.get_next_signal_sequence(counts) for counts in scenarios]
+    index = iter(range(10 ** 9))
+    
+    def green_times():
+        controller.calculate_green_times(scenarios[next(index) % 256])
+    
+    def optimized_green_times():
+        # 256 repeating states, so after warmup this measures the memoized path
+        optimized.calculate_green_times(scenarios[next(index) % 256])
+    
+    def sequence():
+        controller.get_next_signal_sequence(scenarios[next(index) % 256])
+    
+    def efficiency():
+        i = next(index) % 256
+        controller.calculate_efficiency(scenarios[i], sequences[i])
+    
+    return {
+        'controller.calculate_green_times': measure(green_times, iterations, inner=50),
+        'controller.optimized_green_times': measure(optimized_green_times, iterations, warmup=256 // 50 + 1, inner=50),
+        'controller.get_next_signal_sequence': measure(sequence, iterations, inner=50),
+        'controller.calculate_efficiency': measure(efficiency, iterations, inner=50)
+    }
+
+def bench_network(sizes=(10, 30)):
+    from signal_network import grid_network
+    
+    results = {}
+    for size in sizes:
+        network, counts = grid_network(size, size)
+        results[f'network.solve_{size * size}_nodes'] = measure(lambda: network.solve(counts), 5, warmup=1)
+    return results
+
+def bench_dashboard(clients=16, requests_per_client=100):
+    from werkzeug.serving import make_server
+    from dashboard import app, dashboard
+    
+    # Per-request access logs would dominate the output
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    url = f'http://127.0.0.1:{server.server_port}/data'
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    
+    # Keep the state changing while clients poll, like the live simulation does
+    stop = threading.Event()
+    def updater():
+        tick = 0
+        while not stop.is_set():
+            dashboard.update_data({f'camera_{i}': (tick + i) % 30 for i in range(1, 5)},
+                                  f'camera_{tick % 4 + 1}', 20.0)
+            tick += 1
+            time.sleep(0.01)
+    update_thread = threading.Thread(target=updater, daemon=True)
+    
+    latencies = [[] for _ in range(clients)]
+    def client(n):
+        for _ in range(requests_per_client):
+            t0 = time.perf_counter()
+            with urllib.request.urlopen(url) as response:
+                response.read()
+            latencies[n].append(time.perf_counter() - t0)
+    
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    update_thread.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    stop.set()
+    server.shutdown()
+    
+    all_latencies = np.array([latency for per_client in latencies for latency in per_client])
+    return {f'dashboard./data_{clients}_clients': summarize(all_latencies, len(all_latencies), elapsed)}
+
+def compare(results, baseline, threshold, p99_threshold):
+    """Describe benchmarks whose throughput dropped or tail latency grew beyond the thresholds"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current['ops_per_sec'] < previous['ops_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: ops/sec {previous['ops_per_sec']:.0f} → {current['ops_per_sec']:.0f}")
+        if current['p99_ms'] > previous['p99_ms'] * (1 + p99_threshold):
+            regressions.append(f"{name}: p99 {previous['p99_ms']:.3f}ms → {current['p99_ms']:.3f}ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks for detector, controller, network and dashboard')
+    parser.add_argument('--only', choices=['detector', 'controller', 'network', 'dashboard'], action='append',
+                        help='run only these suites (repeatable)')
+    parser.add_argument('--weights', help='local YOLO weights file (default: deterministic stub model)')
+    parser.add_argument('--stub-latency', type=float, default=0.0, help='seconds of fake inference per image')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent /data clients')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='write these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative ops/sec drop before flagging')
+    parser.add_argument('--p99-threshold', type=float, default=0.5, help='allowed relative p99 growth (tails are noisier)')
+    args = parser.parse_args()
+    
+    suites = args.only or ['detector', 'controller', 'network', 'dashboard']
+    results = {}
+    
+    print("⏱️  Running benchmarks:", ', '.join(suites))
+    if 'detector' in suites:
+        results.update(bench_detector(args.weights, args.stub_latency))
+    if 'controller' in suites:
+        results.update(bench_controller())
+    if 'network' in suites:
+        results.update(bench_network())
+    if 'dashboard' in suites:
+        results.update(bench_dashboard(clients=args.clients))
+    
+    print(f"\n{'benchmark':45} {'ops/sec':>12} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, stats in results.items():
+        print(f"{name:45} {stats['ops_per_sec']:12.1f} {stats['p50_ms']:10.3f} {stats['p99_ms']:10.3f}")
+    
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Baseline saved to: {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"\nℹ️  No baseline at {args.baseline} (run with --save-baseline to create one)")
+        return 0
+    
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold, args.p99_threshold)
+    
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+    
+    print(f"\n✅ No regressions against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -3,29 +3,88 @@ import sys
 import json
 import time
 from datetime import datetime
-from flask import Flask, render_template, jsonify
+import threading
+from collections import deque
+from flask import Flask, Response, render_template, request, stream_with_context
 
 # Add src to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+import metrics
+
 app = Flask(__name__)
 
 class TrafficDashboard:
-    def __init__(self):
+    def __init__(self, history_size=256):
         self.current_data = {
             'vehicle_counts': {'camera_1': 0, 'camera_2': 0, 'camera_3': 0, 'camera_4': 0},
             'current_green': None,
             'efficiency': 0,
             'timestamp': datetime.now().strftime('%H:%M:%S')
         }
+        
+        # One shared serialized snapshot per state version, plus recent deltas for streams
+        self.version = 0
+        # Versions restart at 0 with the process, so ETags also carry a per-process epoch
+        self._epoch = f"{time.time_ns():x}"
+        self.snapshot_json = None
+        self.etag = None
+        self.deltas = deque(maxlen=history_size)
+        self.changed = threading.Condition()
+        self._serialize()
+    
+    def _serialize(self):
+        self.snapshot_json = json.dumps(dict(self.current_data, version=self.version))
+        self.etag = f'"{self._epoch}-v{self.version}"'
     
     def update_data(self, vehicle_counts, current_green, efficiency):
-        self.current_data = {
-            'vehicle_counts': vehicle_counts,
-            'current_green': current_green,
-            'efficiency': efficiency,
-            'timestamp': datetime.now().strftime('%H:%M:%S')
-        }
+        previous = self.current_data
+        
+        # Only state changes bump the version and reach streaming clients
+        delta = {}
+        if vehicle_counts.keys() != previous['vehicle_counts'].keys():
+            delta['vehicle_counts'] = dict(vehicle_counts)
+            delta['full'] = True
+        else:
+            changed_counts = {camera: count for camera, count in vehicle_counts.items()
+                              if previous['vehicle_counts'][camera] != count}
+            if changed_counts:
+                delta['vehicle_counts'] = changed_counts
+        if current_green != previous['current_green']:
+            delta['current_green'] = current_green
+        if efficiency != previous['efficiency']:
+            delta['efficiency'] = efficiency
+        
+        if not delta:
+            return
+        
+        with self.changed:
+            self.current_data = {
+                'vehicle_counts': dict(vehicle_counts),
+                'current_green': current_green,
+                'efficiency': efficiency,
+                'timestamp': datetime.now().strftime('%H:%M:%S')
+            }
+            self.version += 1
+            delta['timestamp'] = self.current_data['timestamp']
+            delta['version'] = self.version
+            self.deltas.append((self.version, json.dumps(delta)))
+            self._serialize()
+            self.changed.notify_all()
+    
+    def wait_for_change(self, version, timeout=15):
+        """Block until the state moves past version; returns SSE messages to send"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version > version, timeout=timeout)
+            
+            if self.version == version:
+                return version, []
+            
+            # A client that fell behind the delta history gets a fresh snapshot
+            if not self.deltas or self.deltas[0][0] > version + 1:
+                return self.version, [('snapshot', self.snapshot_json)]
+            
+            return self.version, [('delta', data) for v, data in self.deltas if v > version]
 
 # Global dashboard instance
 dashboard = TrafficDashboard()
@@ -52,32 +111,60 @@ def index():
             <!-- Content will be updated by JavaScript -->
         </div>
         <script>
+            let data = null;
+            
+            function render() {
+                const dashboard = document.getElementById('dashboard');
+                dashboard.innerHTML = `
+                    <div class="stats">
+                        <h3>📊 Live Statistics</h3>
+                        <p>🕒 Last Update: ${data.timestamp}</p>
+                        <p>📈 Efficiency: ${data.efficiency}%</p>
+                        <p>🚥 Current Green: ${data.current_green || 'None'}</p>
+                    </div>
+                    ${Object.entries(data.vehicle_counts).map(([camera, count]) => `
+                        <div class="camera ${data.current_green === camera ? 'green' : 'red'}">
+                            <h3>${camera.toUpperCase()}</h3>
+                            <p>🚗 Vehicles: ${count}</p>
+                            <p>${data.current_green === camera ? '🟢 GREEN' : '🔴 RED'}</p>
+                        </div>
+                    `).join('')}
+                `;
+            }
+            
             function updateDashboard() {
                 fetch('/data')
                     .then(response => response.json())
-                    .then(data => {
-                        const dashboard = document.getElementById('dashboard');
-                        dashboard.innerHTML = `
-                            <div class="stats">
-                                <h3>📊 Live Statistics</h3>
-                                <p>🕒 Last Update: ${data.timestamp}</p>
-                                <p>📈 Efficiency: ${data.efficiency}%</p>
-                                <p>🚥 Current Green: ${data.current_green || 'None'}</p>
-                            </div>
-                            ${Object.entries(data.vehicle_counts).map(([camera, count]) => `
-                                <div class="camera ${data.current_green === camera ? 'green' : 'red'}">
-                                    <h3>${camera.toUpperCase()}</h3>
-                                    <p>🚗 Vehicles: ${count}</p>
-                                    <p>${data.current_green === camera ? '🟢 GREEN' : '🔴 RED'}</p>
-                                </div>
-                            `).join('')}
-                        `;
+                    .then(snapshot => {
+                        data = snapshot;
+                        render();
                     });
             }
             
-            // Update every 3 seconds
-            setInterval(updateDashboard, 3000);
-            updateDashboard(); // Initial load
+            if (window.EventSource) {
+                // Server pushes a snapshot on connect, then only the fields that changed
+                const stream = new EventSource('/stream');
+                stream.addEventListener('snapshot', event => {
+                    data = JSON.parse(event.data);
+                    render();
+                });
+                stream.addEventListener('delta', event => {
+                    const delta = JSON.parse(event.data);
+                    if (delta.vehicle_counts) {
+                        data.vehicle_counts = delta.full
+                            ? delta.vehicle_counts
+                            : Object.assign(data.vehicle_counts, delta.vehicle_counts);
+                    }
+                    for (const key of ['current_green', 'efficiency', 'timestamp', 'version']) {
+                        if (key in delta) data[key] = delta[key];
+                    }
+                    render();
+                });
+            } else {
+                // Update every 3 seconds
+                setInterval(updateDashboard, 3000);
+                updateDashboard(); // Initial load
+            }
         </script>
     </body>
     </html>
@@ -85,12 +172,39 @@ def index():
 
 @app.route('/data')
 def get_data():
-    return jsonify(dashboard.current_data)
+    etag, snapshot_json = dashboard.etag, dashboard.snapshot_json
+    if etag in request.headers.get('If-None-Match', ''):
+        return Response(status=304, headers={'ETag': etag})
+    return Response(snapshot_json, mimetype='application/json', headers={'ETag': etag})
+
+@app.route('/stream')
+def stream():
+    def events():
+        with dashboard.changed:
+            version, snapshot_json = dashboard.version, dashboard.snapshot_json
+        yield f"event: snapshot\ndata: {snapshot_json}\n\n"
+        
+        while True:
+            version, messages = dashboard.wait_for_change(version)
+            if not messages:
+                # Keep-alive comment so proxies don't close idle streams
+                yield ": ping\n\n"
+            for event, data in messages:
+                yield f"event: {event}\ndata: {data}\n\n"
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/metrics')
+def get_metrics():
+    return Response(metrics.STAGES.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 def run_dashboard():
+    # Stage timing is only recorded while something can scrape it
+    metrics.enable()
     print("🌐 Starting Traffic Dashboard...")
     print("   📍 Open http://localhost:5000 in your browser")
-    app.run(debug=True, use_reloader=False)
+    app.run(debug=True, use_reloader=False, threaded=True)
 
 if __name__ == '__main__':
     run_dashboard()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import argparse
+import itertools
+import contextlib
+import io
+import concurrent.futures
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Add src to Python path
+sys.path.append(os.path.join(ROOT, 'src'))
+
+DEFAULT_FOLDERS = [os.path.join(ROOT, 'data', '0'), os.path.join(ROOT, 'data', '5')]
+DEFAULT_OUTPUT = os.path.join(ROOT, 'results', 'evaluation.json')
+
+def load_ground_truth(folder):
+    """Map image paths to reference counts from the folder's output_*.csv (image_index,count rows)"""
+    truth = {}
+    for csv_path in glob.glob(os.path.join(folder, 'output_*.csv')):
+        with open(csv_path, newline='') as f:
+            for row in csv.reader(f):
+                if len(row) < 2 or not row[0].strip().isdigit():
+                    continue
+                image_path = os.path.join(folder, f"{int(row[0])}.jpg")
+                if os.path.exists(image_path):
+                    truth[image_path] = float(row[1])
+    return truth
+
+def evaluate_config(config, images, truths, repeats=3, threads=None):
+    """Count error and throughput of one detector configuration (runs in a worker process)"""
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    
+    from vehicle_detector import VehicleDetector
+    
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if config['backend'] == 'stub':
+                from stub_model import StubYOLO
+                detector = VehicleDetector(model_path='stub', model=StubYOLO(), imgsz=config['imgsz'],
+                                           conf=config['conf'])
+            else:
+                detector = VehicleDetector(config['weights'], imgsz=config['imgsz'], conf=config['conf'],
+                                           backend=config['backend'])
+    except Exception as e:
+        return dict(config, error=str(e))
+    
+    # Best of several passes, so one noisy pass does not decide the ranking
+    elapsed = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = detector.detect_many(images, batch_size=config['batch_size'])
+        elapsed = min(elapsed, time.perf_counter() - start)
+    
+    errors = np.array(counts, dtype=float) - np.array(truths)
+    return dict(config,
+                fps=len(images) / elapsed if elapsed > 0 else 0.0,
+                mae=float(np.mean(np.abs(errors))),
+                rmse=float(np.sqrt(np.mean(errors ** 2))),
+                bias=float(np.mean(errors)),
+                exact=float(np.mean(np.rint(errors) == 0)),
+                counts=[int(count) for count in counts])
+
+def pareto_front(results):
+    """Results no other result beats on both mean absolute error and fps"""
+    front = []
+    best_mae = float('inf')
+    for result in sorted(results, key=lambda r: (-r['fps'], r['mae'])):
+        if result['mae'] < best_mae:
+            front.append(result)
+            best_mae = result['mae']
+    return front
+
+def _export_backends(weights, backends, imgsizes):
+    """Export once up front so worker processes never race on the same artifact"""
+    from inference_backends import export_model
+    
+    available = []
+    for backend in backends:
+        if backend in ('pytorch', 'stub'):
+            available.append(backend)
+            continue
+        try:
+            for imgsz in imgsizes:
+                export_model(weights, backend, imgsz=imgsz)
+            available.append(backend)
+        except Exception as e:
+            print(f"❌ Backend {backend} unavailable: {e}")
+    return available
+
+def main():
+    parser = argparse.ArgumentParser(description='Detector count accuracy vs throughput over a settings grid')
+    parser.add_argument('--folders', nargs='+', default=DEFAULT_FOLDERS, help='image folders with output_*.csv')
+    parser.add_argument('--weights', default='yolov8n.pt')
+    parser.add_argument('--imgsz', type=int, nargs='+', default=[320, 480, 640])
+    parser.add_argument('--conf', type=float, nargs='+', default=[0.15, 0.25, 0.4])
+    parser.add_argument('--backends', nargs='+', default=['pytorch'],
+                        help="pytorch, onnx, onnx-int8, openvino, openvino-int8, or stub (no weights)")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--repeats', type=int, default=3, help='timed passes per configuration (best is kept)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the full results JSON')
+    args = parser.parse_args()
+    
+    truth = {}
+    for folder in args.folders:
+        truth.update(load_ground_truth(folder))
+    if not truth:
+        print(f"❌ No ground truth found in: {', '.join(args.folders)}")
+        return 1
+    images = sorted(truth)
+    truths = [truth[path] for path in images]
+    
+    backends = _export_backends(args.weights, args.backends, args.imgsz)
+    configs = [{'weights': args.weights, 'backend': backend, 'imgsz': imgsz, 'conf': conf, 'batch_size': batch_size}
+               for backend, imgsz, conf, batch_size in itertools.product(backends, args.imgsz, args.conf,
+                                                                         args.batch_sizes)]
+    
+    # Split the cores between workers so parallel configurations do not oversubscribe the CPU
+    threads = max(1, (os.cpu_count() or 1) // args.workers)
+    print(f"🧪 Evaluating {len(configs)} configurations on {len(images)} images "
+          f"({args.workers} workers x {threads} threads)")
+    
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(evaluate_config, config, images, truths, args.repeats, threads)
+                   for config in configs]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            if 'error' in result:
+                print(f"❌ {result['backend']} imgsz={result['imgsz']}: {result['error']}")
+            else:
+                results.append(result)
+    
+    if not results:
+        return 1
+    
+    front = pareto_front(results)
+    print(f"\n{'backend':14} {'imgsz':>5} {'conf':>5} {'batch':>5} {'images/s':>9} {'MAE':>6} "
+          f"{'RMSE':>6} {'bias':>6} {'exact':>6}")
+    for result in sorted(results, key=lambda r: -r['fps']):
+        marker = ' ★' if result in front else ''
+        print(f"{result['backend']:14} {result['imgsz']:5} {result['conf']:5.2f} {result['batch_size']:5} "
+              f"{result['fps']:9.1f} {result['mae']:6.2f} {result['rmse']:6.2f} {result['bias']:+6.2f} "
+              f"{result['exact']:6.0%}{marker}")
+    print("\n★ = Pareto front (no configuration is both faster and more accurate)")
+    
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'images': images, 'ground_truth': truths, 'results': results,
+                   'pareto': [results.index(result) for result in front]}, f, indent=2)
+    print(f"💾 Results saved to: {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
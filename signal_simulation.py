@@ -1,6 +1,5 @@
 import os
 import sys
-import json
 from datetime import datetime
 
 # Add src to Python path
@@ -12,14 +11,18 @@ def main():
     
     try:
         from signal_controller import TrafficSignalController
-        from vehicle_detector import VehicleDetector
+        from detector_server import connect_detector
+        from cycle_history import CycleHistory
+        from split_optimizer import SplitOptimizer
     except ImportError as e:
         print(f"❌ Import error: {e}")
         return
     
     # Initialize systems
-    controller = TrafficSignalController()
-    detector = VehicleDetector()
+    controller = TrafficSignalController(history=CycleHistory('results/signal_cycles.jsonl'),
+                                         split_optimizer=SplitOptimizer())
+    # Reuse a running detector server (weights already loaded) when there is one
+    detector = connect_detector(cache_dir='results/detection_cache')
     
     print("📊 Running Simulation with ACTUAL Vehicle Detection")
     print("=" * 60)
@@ -48,10 +51,12 @@ def main():
         vehicle_counts = {}
         image_files = [f for f in os.listdir(folder_path) if f.endswith(('.jpg', '.png'))]
         
-        # Process first 4 images as our 4 cameras
-        for i, image_file in enumerate(image_files[:4], 1):
-            image_path = os.path.join(folder_path, image_file)
-            count = detector.detect_vehicles(image_path)
+        # Process first 4 images as our 4 cameras (one batched inference call)
+        camera_files = image_files[:4]
+        image_paths = [os.path.join(folder_path, image_file) for image_file in camera_files]
+        counts = detector.detect_many(image_paths, batch_size=len(image_paths) or 1)
+        
+        for i, (image_file, count) in enumerate(zip(camera_files, counts), 1):
             vehicle_counts[f'camera_{i}'] = count
             print(f"   📷 {image_file}: {count} vehicles")
         
@@ -59,13 +64,13 @@ def main():
         if vehicle_counts:
             cycle_info = controller.simulate_signal_cycle(vehicle_counts)
             print(f"📈 Cycle Efficiency: {cycle_info['efficiency']:.1f}%")
-        
-        # Save results
-        with open('results/signal_cycles.json', 'w') as f:
-            json.dump(controller.cycle_data, f, indent=2)
+    
+    # Flush remaining cycles to the append-only log
+    controller.cycle_data.close()
     
     print(f"\n✅ Simulation completed! Processed {len(controller.cycle_data)} scenarios")
-    print("💾 Results saved to: results/signal_cycles.json")
+    print(f"📈 Average efficiency: {controller.cycle_data.stats.mean_efficiency:.1f}%")
+    print("💾 Results appended to: results/signal_cycles.jsonl")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
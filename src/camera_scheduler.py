@@ -0,0 +1,208 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+
+from video_ingest import FrameSource
+
+class CameraScheduler:
+    """Deadline-aware asyncio ingest of many cameras feeding the signal controller
+    
+    Every camera is watched concurrently (an image directory or a FrameSource). Only
+    the freshest frame per camera is kept; older undetected frames are dropped.
+    Detection runs in an executor, and at each cycle deadline the controller gets a
+    complete camera_counts dict, with last-known counts for cameras that missed it.
+    """
+    
+    def __init__(self, detector, camera_sources, lane_counter=None, poll_interval=0.5,
+                 planning_margin=1.0, time_scale=1.0):
+        self.detector = detector
+        self.lane_counter = lane_counter
+        self.camera_sources = camera_sources
+        self.poll_interval = poll_interval
+        # Seconds before the end of a cycle at which the next one is planned
+        self.planning_margin = planning_margin
+        # Wall-clock seconds per signal second (e.g. 0.01 to replay cycles quickly)
+        self.time_scale = time_scale
+        
+        cameras = list(camera_sources.keys())
+        self.latest = {camera: None for camera in cameras}
+        self.counts = {camera: 0 for camera in cameras}
+        # When the newest frame arrived, and when the frame behind the current count arrived
+        self.offered_at = {camera: None for camera in cameras}
+        self.counted_at = {camera: None for camera in cameras}
+        self._unreadable = set()
+        self.dropped = 0
+        self.misses = 0
+        
+        self._io_executor = ThreadPoolExecutor(max_workers=len(cameras))
+        self._detect_executor = ThreadPoolExecutor(max_workers=1)
+        self._frame_ready = None
+    
+    def _newest_image(self, directory):
+        """(mtime, path, size) of the most recently written image in directory, or None"""
+        newest = None
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.lower().endswith(('.png', '.jpg', '.jpeg')):
+                        stat = entry.stat()
+                        if newest is None or (stat.st_mtime_ns, entry.path) > newest[:2]:
+                            newest = (stat.st_mtime_ns, entry.path, stat.st_size)
+        except OSError as e:
+            if directory not in self._unreadable:
+                self._unreadable.add(directory)
+                print(f"❌ Could not read camera folder {directory}: {e}")
+        return newest
+    
+    def _offer(self, camera, frame):
+        # Keep only the freshest frame; one that was never detected is dropped
+        if self.latest[camera] is not None:
+            self.dropped += 1
+        self.offered_at[camera] = time.monotonic()
+        self.latest[camera] = (self.offered_at[camera], frame)
+        self._frame_ready.set()
+    
+    async def _watch_directory(self, camera, directory):
+        loop = asyncio.get_running_loop()
+        last_seen = None
+        previous = None
+        while True:
+            newest = await loop.run_in_executor(self._io_executor, self._newest_image, directory)
+            # Only offer a file once its size and mtime held still for a poll (the camera finished writing it)
+            if newest is not None and newest == previous and newest != last_seen:
+                last_seen = newest
+                self._offer(camera, newest[1])
+            previous = newest
+            await asyncio.sleep(self.poll_interval)
+    
+    async def _watch_source(self, camera, source):
+        loop = asyncio.get_running_loop()
+        while True:
+            sample = await loop.run_in_executor(self._io_executor, source.read)
+            if sample is None:
+                print(f"📼 {camera}: source finished, keeping last count")
+                return
+            self._offer(camera, sample[1])
+    
+    def _read_frame(self, camera, frame):
+        """Decode an image path, or None if it is unreadable or truncated (arrays pass through)"""
+        if not isinstance(frame, str):
+            return frame
+        try:
+            with open(frame, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            print(f"❌ {camera}: could not read {frame}: {e}")
+            return None
+        
+        # A JPEG or PNG that is still being written lacks its end marker but may still decode
+        complete = data.rstrip(b'\0').endswith(b'\xff\xd9') or data.endswith(b'IEND\xaeB`\x82')
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR) if complete else None
+        if image is None:
+            print(f"❌ {camera}: incomplete or undecodable image {frame}, keeping last count")
+        return image
+    
+    def _count(self, frames):
+        """Counts for the cameras whose frame decoded; failed cameras are left out so they miss"""
+        sources = {camera: frame for camera, frame in frames.items() if isinstance(frame, str)}
+        decoded = {camera: self._read_frame(camera, frame) for camera, frame in frames.items()}
+        frames = {camera: image for camera, image in decoded.items() if image is not None}
+        if not frames:
+            return {}
+        if self.lane_counter:
+            return self.lane_counter.camera_totals(self.lane_counter.count_lanes(frames))
+        # Paths still name the frames, so the detection cache keys on the file bytes
+        counts = self.detector.detect_many(list(frames.values()), batch_size=len(frames),
+                                           sources=[sources.get(camera) for camera in frames])
+        return dict(zip(frames.keys(), counts))
+    
+    async def _detect_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._frame_ready.wait()
+            self._frame_ready.clear()
+            
+            pending = {camera: item for camera, item in self.latest.items() if item is not None}
+            for camera in pending:
+                self.latest[camera] = None
+            frames = {camera: frame for camera, (_, frame) in pending.items()}
+            
+            # All cameras with a fresh frame share one batched inference call
+            try:
+                counts = await loop.run_in_executor(self._detect_executor, self._count, frames)
+            except Exception as e:
+                # A failed batch must not stop counting: requeue frames nothing newer replaced and retry
+                print(f"❌ Detection failed for {', '.join(frames)}: {e}")
+                for camera, item in pending.items():
+                    if self.latest[camera] is None:
+                        self.latest[camera] = item
+                await asyncio.sleep(self.poll_interval)
+                self._frame_ready.set()
+                continue
+            for camera, count in counts.items():
+                self.counts[camera] = count
+                self.counted_at[camera] = pending[camera][0]
+    
+    async def run(self, controller, cycles=None, initial_wait=2.0):
+        """Plan signal cycles until cycles have run (forever if None)"""
+        self._frame_ready = asyncio.Event()
+        tasks = []
+        for camera, source in self.camera_sources.items():
+            if isinstance(source, FrameSource):
+                tasks.append(asyncio.create_task(self._watch_source(camera, source)))
+            else:
+                tasks.append(asyncio.create_task(self._watch_directory(camera, source)))
+        tasks.append(asyncio.create_task(self._detect_loop()))
+        
+        completed = 0
+        cycle_start = time.monotonic()
+        deadline = cycle_start + initial_wait
+        
+        try:
+            while cycles is None or completed < cycles:
+                # Planning never waits past the deadline for a slow camera
+                await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+                
+                # A camera misses when it has no count yet or its newest frame is still undetected
+                camera_counts = dict(self.counts)
+                missed = [camera for camera in camera_counts
+                          if self.offered_at[camera] is None or self.counted_at[camera] != self.offered_at[camera]]
+                if missed:
+                    self.misses += len(missed)
+                    print(f"⚠️  No fresh count before deadline for {', '.join(missed)} (using last known)")
+                
+                cycle_info = controller.simulate_signal_cycle(camera_counts)
+                completed += 1
+                
+                cycle_start = time.monotonic()
+                cycle_seconds = cycle_info['total_cycle_time'] * self.time_scale
+                deadline = cycle_start + max(0.0, cycle_seconds - self.planning_margin * self.time_scale)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        print(f"\n📡 Scheduler finished {completed} cycles | "
+              f"{self.dropped} stale frames dropped | {self.misses} camera deadline misses")
+        return completed
+    
+    def close(self):
+        self._io_executor.shutdown(wait=False)
+        self._detect_executor.shutdown(wait=False)
+
+# Watch the sample camera folders, replaying signal time 20x faster
+if __name__ == "__main__":
+    from signal_controller import TrafficSignalController
+    from vehicle_detector import VehicleDetector
+    
+    cameras_root = os.path.join(os.path.dirname(__file__), '..', 'data', 'cameras')
+    camera_sources = {f'camera_{i}': os.path.join(cameras_root, f'camera_{i}') for i in range(1, 5)}
+    
+    scheduler = CameraScheduler(VehicleDetector(), camera_sources, time_scale=0.05)
+    try:
+        asyncio.run(scheduler.run(TrafficSignalController(), cycles=3))
+    finally:
+        scheduler.close()
\ No newline at end of file
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+from collections import deque
+from datetime import datetime
+
+class RunningStats:
+    """Running averages of cycle efficiency, cycle time and per-camera counts, updated in O(approaches)"""
+    
+    def __init__(self):
+        self.cycles = 0
+        self.mean_efficiency = 0.0
+        self.mean_cycle_time = 0.0
+        self.mean_counts = {}
+    
+    def add(self, cycle_info):
+        self.cycles += 1
+        weight = 1.0 / self.cycles
+        self.mean_efficiency += (cycle_info['efficiency'] - self.mean_efficiency) * weight
+        self.mean_cycle_time += (cycle_info['total_cycle_time'] - self.mean_cycle_time) * weight
+        for camera, count in cycle_info['camera_counts'].items():
+            # Cameras added later average over the cycles they were part of
+            mean, seen = self.mean_counts.get(camera, (0.0, 0))
+            self.mean_counts[camera] = (mean + (count - mean) / (seen + 1), seen + 1)
+    
+    def as_dict(self):
+        return {
+            'cycles': self.cycles,
+            'average_efficiency': self.mean_efficiency,
+            'average_cycle_time': self.mean_cycle_time,
+            'average_counts': {camera: mean for camera, (mean, _) in self.mean_counts.items()}
+        }
+
+class CycleHistory:
+    """Bounded in-memory ring buffer of signal cycles backed by an append-only JSONL log
+    
+    Memory stays flat (only the last max_in_memory cycles are kept) and each cycle
+    costs one buffered line write, flushed every flush_every cycles or flush_interval
+    seconds. With path=None the history is memory-only.
+    """
+    
+    def __init__(self, path=None, max_in_memory=1000, flush_every=10, flush_interval=5.0):
+        self.path = path
+        self.recent = deque(maxlen=max_in_memory)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.total_cycles = 0
+        # Averages over every cycle ever appended, not just the ones still in memory
+        self.stats = RunningStats()
+        
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+    
+    def append(self, cycle_info):
+        self.recent.append(cycle_info)
+        self.total_cycles += 1
+        self.stats.add(cycle_info)
+        
+        if self.path:
+            self._pending.append(json.dumps(cycle_info, separators=(',', ':')) + '\n')
+            if (len(self._pending) >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+    
+    def flush(self):
+        """Write buffered cycles to the end of the log"""
+        if not self.path or not self._pending:
+            return
+        
+        if self._file is None:
+            self._file = open(self.path, 'a')
+        self._file.write(''.join(self._pending))
+        self._file.flush()
+        self._pending = []
+        self._last_flush = time.monotonic()
+    
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def __len__(self):
+        return self.total_cycles
+    
+    def __iter__(self):
+        """Iterate over the cycles still held in memory"""
+        return iter(self.recent)
+    
+    def query(self, start=None, end=None, camera=None):
+        """Yield logged cycles with start <= timestamp < end that include camera
+        
+        start and end may be datetimes or ISO strings. The log is written in time
+        order, so the start offset is found by binary search instead of a full scan.
+        """
+        if not self.path:
+            yield from (cycle for cycle in self.recent if self._matches(cycle, start, end, camera))
+            return
+        
+        self.flush()
+        if not os.path.exists(self.path):
+            return
+        
+        start = start.isoformat() if isinstance(start, datetime) else start
+        end = end.isoformat() if isinstance(end, datetime) else end
+        camera_key = f'"{camera}"'.encode() if camera else None
+        
+        with open(self.path, 'rb') as f:
+            f.seek(self._find_offset(f, start) if start else 0)
+            
+            for line in f:
+                # Cheap byte checks before paying for a JSON parse
+                if camera_key and camera_key not in line:
+                    continue
+                cycle = json.loads(line)
+                if end and cycle['timestamp'] >= end:
+                    break
+                if self._matches(cycle, start, end, camera):
+                    yield cycle
+    
+    def _matches(self, cycle, start, end, camera):
+        start = start.isoformat() if isinstance(start, datetime) else start
+        end = end.isoformat() if isinstance(end, datetime) else end
+        if start and cycle['timestamp'] < start:
+            return False
+        if end and cycle['timestamp'] >= end:
+            return False
+        return camera is None or camera in cycle['camera_counts']
+    
+    def _line_start(self, f, offset):
+        """Offset of the first line beginning at or after offset"""
+        if offset == 0:
+            return 0
+        f.seek(offset - 1)
+        f.readline()
+        return f.tell()
+    
+    def _find_offset(self, f, start):
+        """Smallest line offset whose cycle timestamp is >= start"""
+        f.seek(0, os.SEEK_END)
+        lo, hi = 0, f.tell()
+        
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(self._line_start(f, mid))
+            line = f.readline()
+            if not line or json.loads(line)['timestamp'] >= start:
+                hi = mid
+            else:
+                lo = mid + 1
+        
+        return self._line_start(f, lo)
\ No newline at end of file
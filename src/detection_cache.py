@@ -0,0 +1,114 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+
+class DetectionCache:
+    """Content-addressed on-disk cache of detection results with LRU size eviction"""
+    
+    def __init__(self, cache_dir='results/detection_cache', max_bytes=64 * 1024 * 1024, low_water=0.9):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Eviction frees down to this share of max_bytes, so a full cache does not
+        # rescan every entry on each following miss
+        self.low_water = low_water
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.total_bytes = sum(os.path.getsize(path) for path in self._entry_paths())
+    
+    def _entry_paths(self):
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if name.endswith('.json')]
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def make_key(self, image, settings):
+        """Hash image content (file bytes or array pixels) together with detector settings"""
+        digest = hashlib.sha256()
+        
+        if isinstance(image, str):
+            with open(image, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+        else:
+            array = np.ascontiguousarray(image)
+            digest.update(f"{array.shape}|{array.dtype}".encode())
+            digest.update(array.tobytes())
+        
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """Return cached vehicle boxes as an (N, 6) array, or None on a miss"""
+        path = self._path(key)
+        
+        with self._lock:
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+                # Touch the entry so eviction sees it as recently used
+                os.utime(path)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+        
+        return np.array(entry['boxes'], dtype=np.float32).reshape(-1, 6)
+    
+    def put(self, key, boxes):
+        """Store vehicle boxes (and their count) for a key"""
+        entry = {'count': int(len(boxes)), 'boxes': np.asarray(boxes).tolist()}
+        data = json.dumps(entry, separators=(',', ':'))
+        path = self._path(key)
+        # Unique per process and thread: several processes may share one cache directory
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        
+        with self._lock:
+            try:
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                with open(tmp_path, 'w') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"❌ Could not write cache entry: {e}")
+                return
+            
+            self.total_bytes += os.path.getsize(path) - old_size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+    
+    def _evict(self):
+        """Remove least recently used entries until the cache is down to its low-water mark"""
+        entries = []
+        for path in self._entry_paths():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        entries.sort()
+        self.total_bytes = sum(size for _, size, _ in entries)
+        
+        target = self.max_bytes * self.low_water
+        for _, size, path in entries:
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self.total_bytes -= size
+            except OSError:
+                continue
+    
+    def clear(self):
+        """Remove every cache entry"""
+        with self._lock:
+            for path in self._entry_paths():
+                os.remove(path)
+            self.total_bytes = 0
@@ -0,0 +1,205 @@
+import os
+import json
+import struct
+import socket
+import argparse
+import threading
+import socketserver
+
+DEFAULT_SOCKET = os.environ.get('TRAFFIC_DETECTOR_SOCKET', '/tmp/green_traffic_detector.sock')
+
+# Each message is a 4-byte header length, a JSON header, then header['payload_bytes'] raw bytes
+def _send_message(sock, header, payload=b''):
+    header = dict(header, payload_bytes=len(payload))
+    data = json.dumps(header, separators=(',', ':')).encode()
+    sock.sendall(struct.pack('>I', len(data)) + data + payload)
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed mid-message")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def _recv_message(sock):
+    header = json.loads(_recv_exact(sock, struct.unpack('>I', _recv_exact(sock, 4))[0]))
+    payload = _recv_exact(sock, header['payload_bytes']) if header['payload_bytes'] else b''
+    return header, payload
+
+class DetectorClient:
+    """VehicleDetector-compatible client for a DetectorServer on a local Unix socket
+    
+    Importing and constructing it is cheap: no ultralytics, torch or cv2, and no weights.
+    """
+    
+    def __init__(self, socket_path=DEFAULT_SOCKET, timeout=60.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._inference_args = None
+    
+    def _request(self, header, payload=b''):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            _send_message(sock, header, payload)
+            response, _ = _recv_message(sock)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response
+    
+    def ping(self):
+        try:
+            return self._request({'op': 'ping'}).get('ok', False)
+        except OSError:
+            return False
+    
+    @property
+    def inference_args(self):
+        """The server detector's default inference settings (fetched once)"""
+        if self._inference_args is None:
+            self._inference_args = self._request({'op': 'ping'})['inference_args']
+        return self._inference_args
+    
+    def _detect(self, images, batch_size, want_boxes, overrides=None):
+        items = []
+        chunks = []
+        offset = 0
+        for image in images:
+            if isinstance(image, str):
+                # The server may run in another directory
+                items.append({'path': os.path.abspath(image)})
+            else:
+                data = image.tobytes()
+                items.append({'shape': list(image.shape), 'dtype': str(image.dtype),
+                              'offset': offset, 'nbytes': len(data)})
+                chunks.append(data)
+                offset += len(data)
+        
+        header = {'op': 'detect', 'items': items, 'batch_size': batch_size, 'boxes': want_boxes,
+                  'overrides': overrides or {}}
+        return self._request(header, b''.join(chunks))
+    
+    def detect_many(self, images, batch_size=8):
+        """Detect vehicles in many images (paths or arrays) and return a list of counts"""
+        try:
+            return self._detect(images, batch_size, False)['counts']
+        except (OSError, RuntimeError) as e:
+            print(f"❌ Detector server error: {e}")
+            return [0] * len(images)
+    
+    def detect_boxes(self, images, batch_size=8, **overrides):
+        """Detect vehicles in many images and return a list of (N, 6) box arrays"""
+        import numpy as np
+        
+        try:
+            boxes = self._detect(images, batch_size, True, overrides)['boxes']
+        except (OSError, RuntimeError) as e:
+            print(f"❌ Detector server error: {e}")
+            boxes = [[] for _ in images]
+        return [np.array(b, dtype=np.float32).reshape(-1, 6) for b in boxes]
+    
+    def detect_vehicles(self, image_path):
+        """Detect vehicles in a single image and return count"""
+        return self.detect_many([image_path], batch_size=1)[0]
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            header, payload = _recv_message(self.request)
+            response = self.server.dispatch(header, payload)
+        except Exception as e:
+            response = {'error': str(e)}
+        try:
+            _send_message(self.request, response)
+        except OSError:
+            pass
+
+class DetectorServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Long-lived process holding one loaded VehicleDetector for every local client"""
+    
+    daemon_threads = True
+    
+    def __init__(self, socket_path=DEFAULT_SOCKET, **detector_kwargs):
+        from vehicle_detector import VehicleDetector
+        
+        # Claim the socket before loading the model, so a second launch fails fast
+        self.socket_path = socket_path
+        if os.path.exists(socket_path):
+            if DetectorClient(socket_path, timeout=1.0).ping():
+                raise RuntimeError(f"A detector server is already running on {socket_path}")
+            os.remove(socket_path)
+        super().__init__(socket_path, _Handler)
+        
+        try:
+            self.detector = VehicleDetector(**detector_kwargs)
+        except Exception:
+            self.server_close()
+            raise
+        # The model is not safe to call from several threads at once
+        self._model_lock = threading.Lock()
+    
+    def dispatch(self, header, payload):
+        import numpy as np
+        
+        if header['op'] == 'ping':
+            return {'ok': True, 'backend': self.detector.backend, 'model_path': self.detector.model_path,
+                    'inference_args': self.detector.inference_args}
+        if header['op'] != 'detect':
+            return {'error': f"Unknown op: {header['op']}"}
+        
+        images = []
+        for item in header['items']:
+            if 'path' in item:
+                images.append(item['path'])
+            else:
+                dtype = np.dtype(item['dtype'])
+                array = np.frombuffer(payload, dtype=dtype, count=item['nbytes'] // dtype.itemsize,
+                                      offset=item['offset'])
+                images.append(array.reshape(item['shape']))
+        
+        with self._model_lock:
+            boxes = self.detector.detect_boxes(images, batch_size=header.get('batch_size', 8),
+                                               **header.get('overrides', {}))
+        
+        response = {'counts': [len(b) for b in boxes]}
+        if header.get('boxes'):
+            response['boxes'] = [b.tolist() for b in boxes]
+        return response
+    
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+def connect_detector(socket_path=DEFAULT_SOCKET, **detector_kwargs):
+    """Use the machine's detector server if one is running, else load a VehicleDetector here"""
+    client = DetectorClient(socket_path)
+    if os.path.exists(socket_path) and client.ping():
+        print(f"🔌 Using detector server at {socket_path}")
+        return client
+    
+    from vehicle_detector import VehicleDetector
+    return VehicleDetector(**detector_kwargs)
+
+# Run the shared detector: python src/detector_server.py [--backend onnx]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve vehicle detection over a local Unix socket')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    parser.add_argument('--weights', default='yolov8n.pt')
+    parser.add_argument('--backend', default='pytorch')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--cache-dir', help='persistent detection cache directory')
+    args = parser.parse_args()
+    
+    server = DetectorServer(args.socket, model_path=args.weights, backend=args.backend,
+                            imgsz=args.imgsz, cache_dir=args.cache_dir)
+    print(f"🛰️  Detector server listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Detector server stopped")
+    finally:
+        server.server_close()
\ No newline at end of file
@@ -0,0 +1,128 @@
+import os
+import sys
+import queue
+import threading
+import cv2
+import numpy as np
+
+# Label colours (BGR), one per class id modulo the palette size
+PALETTE = [(4, 42, 255), (11, 219, 235), (243, 243, 243), (0, 223, 183), (17, 31, 104), (255, 111, 221),
+           (255, 68, 79), (204, 237, 0), (0, 243, 68), (189, 0, 255), (0, 180, 255), (221, 0, 186)]
+
+def draw_boxes(image, boxes, names=None):
+    """Draw (N, 6) x1, y1, x2, y2, conf, cls boxes with class labels, like data/predicted*"""
+    annotated = image.copy()
+    thickness = max(1, round(sum(image.shape[:2]) / 600))
+    font_scale = thickness / 3
+    
+    for x1, y1, x2, y2, _, class_id in np.asarray(boxes).reshape(-1, 6):
+        colour = PALETTE[int(class_id) % len(PALETTE)]
+        top_left, bottom_right = (int(x1), int(y1)), (int(x2), int(y2))
+        cv2.rectangle(annotated, top_left, bottom_right, colour, thickness, cv2.LINE_AA)
+        
+        label = names.get(int(class_id), str(int(class_id))) if names else str(int(class_id))
+        (width, height), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+        # Label above the box, or inside it when the box touches the top edge
+        above = top_left[1] - height - 3 >= 0
+        label_bottom = top_left[1] if above else top_left[1] + height + 3
+        cv2.rectangle(annotated, (top_left[0], label_bottom - height - 3), (top_left[0] + width, label_bottom),
+                      colour, -1, cv2.LINE_AA)
+        text_colour = (0, 0, 0) if sum(colour) > 382 else (255, 255, 255)
+        cv2.putText(annotated, label, (top_left[0], label_bottom - 2), cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+                    text_colour, thickness, cv2.LINE_AA)
+    return annotated
+
+class AnnotatedFrameWriter:
+    """Draws and JPEG-encodes detection boxes on background threads, off the counting path
+    
+    submit() only hands the frame to a bounded queue: when the workers fall behind
+    the frame is dropped rather than slowing detection. every_n keeps one frame in N.
+    """
+    
+    def __init__(self, output_dir='results/predicted', every_n=1, num_workers=2, queue_size=32,
+                 jpeg_quality=90, names=None):
+        self.output_dir = output_dir
+        self.every_n = max(1, every_n)
+        self.jpeg_quality = jpeg_quality
+        # Class id -> name for labels; VehicleDetector fills it from its model if left empty
+        self.names = names
+        
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        os.makedirs(output_dir, exist_ok=True)
+        
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(max(1, num_workers))]
+        for worker in self._workers:
+            worker.start()
+    
+    def submit(self, image, boxes, name=None):
+        """Queue an image (path or array) and its boxes for writing; returns False if skipped or dropped"""
+        with self._lock:
+            index = self.submitted
+            self.submitted += 1
+        if index % self.every_n:
+            return False
+        
+        if name is None:
+            name = os.path.basename(image) if isinstance(image, str) else f"frame_{index:06d}.jpg"
+        try:
+            self._queue.put_nowait((image, np.array(boxes, copy=True), name))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+    
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            image, boxes, name = item
+            try:
+                # Paths (e.g. cache hits) are decoded here, not on the counting thread
+                if isinstance(image, str):
+                    image = cv2.imread(image)
+                if image is None:
+                    raise ValueError("could not decode image")
+                annotated = draw_boxes(image, boxes, self.names)
+                ok, encoded = cv2.imencode('.jpg', annotated, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if not ok:
+                    raise ValueError("JPEG encoding failed")
+                with open(os.path.join(self.output_dir, os.path.splitext(name)[0] + '.jpg'), 'wb') as f:
+                    f.write(encoded.tobytes())
+                with self._lock:
+                    self.written += 1
+            except Exception as e:
+                print(f"❌ Could not write annotated {name}: {e}")
+    
+    def close(self):
+        """Finish the queued frames and stop the workers"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        print(f"🖼️  Annotated frames: {self.written} written, {self.dropped} dropped under load "
+              f"(every {self.every_n} of {self.submitted} frames) → {self.output_dir}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+# Example: python src/frame_writer.py data/0 results/predicted0 [every_n]
+if __name__ == "__main__":
+    from vehicle_detector import VehicleDetector
+    
+    if len(sys.argv) < 3:
+        print("Usage: python src/frame_writer.py <image folder> <output folder> [every_n]")
+        sys.exit(1)
+    
+    every_n = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    with AnnotatedFrameWriter(sys.argv[2], every_n=every_n) as writer:
+        detector = VehicleDetector(frame_writer=writer)
+        detector.process_images_folder(sys.argv[1])
\ No newline at end of file
@@ -0,0 +1,178 @@
+import os
+import re
+import glob
+import time
+import argparse
+import tempfile
+import cv2
+import numpy as np
+
+BACKENDS = ('pytorch', 'onnx', 'onnx-int8', 'openvino', 'openvino-int8')
+
+def _is_fresh(path, source):
+    """True if an exported artifact exists and is newer than the weights it came from"""
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+def calibration_images(calibration_dir='data', limit=64):
+    """Image paths under calibration_dir (recursively) for INT8 calibration"""
+    paths = sorted(path for path in glob.glob(os.path.join(calibration_dir, '**', '*'), recursive=True)
+                   if path.lower().endswith(('.png', '.jpg', '.jpeg')))
+    return paths[:limit]
+
+def letterbox(image, imgsz=640):
+    """Resize keeping aspect ratio and pad to imgsz x imgsz, as YOLO preprocessing does"""
+    height, width = image.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_width, new_height = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - new_height) // 2, (imgsz - new_width) // 2
+    canvas[top:top + new_height, left:left + new_width] = resized
+    return canvas
+
+def _preprocess(path, imgsz):
+    image = letterbox(cv2.imread(path), imgsz)
+    # BGR HWC uint8 -> RGB NCHW float32 in [0, 1]
+    return np.ascontiguousarray(image[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+def _export_onnx(weights, imgsz):
+    from ultralytics import YOLO
+    
+    onnx_path = os.path.splitext(weights)[0] + '.onnx'
+    if not _is_fresh(onnx_path, weights):
+        print(f"📦 Exporting {weights} to ONNX...")
+        # Dynamic axes so detect_many can send whole batches
+        onnx_path = YOLO(weights).export(format='onnx', imgsz=imgsz, dynamic=True)
+    return onnx_path
+
+def _quantize_onnx(onnx_path, weights, imgsz, calibration_dir):
+    try:
+        import onnx
+        from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                              quantize_static)
+    except ImportError:
+        raise ImportError("INT8 ONNX needs onnx and onnxruntime: pip install onnx onnxruntime")
+    
+    # Calibration runs at one input size, so each imgsz gets its own INT8 model
+    int8_path = f"{os.path.splitext(onnx_path)[0]}_{imgsz}_int8.onnx"
+    if _is_fresh(int8_path, weights):
+        return int8_path
+    
+    images = calibration_images(calibration_dir)
+    if not images:
+        raise ValueError(f"No calibration images found under {calibration_dir}")
+    
+    model = onnx.load(onnx_path)
+    input_name = model.graph.input[0].name
+    
+    class ImageReader(CalibrationDataReader):
+        def __init__(self):
+            self.paths = iter(images)
+        
+        def get_next(self):
+            path = next(self.paths, None)
+            return None if path is None else {input_name: _preprocess(path, imgsz)}
+    
+    # Keep the detection head (last module) in float: quantizing box decoding hurts accuracy
+    module_ids = [int(match.group(1)) for match in (re.match(r'/model\.(\d+)/', node.name)
+                                                     for node in model.graph.node) if match]
+    head = f'/model.{max(module_ids)}/' if module_ids else None
+    excluded = [node.name for node in model.graph.node if head and node.name.startswith(head)]
+    
+    print(f"🧮 Quantizing {onnx_path} to INT8 with {len(images)} calibration images...")
+    quantize_static(onnx_path, int8_path, ImageReader(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                    nodes_to_exclude=excluded)
+    return int8_path
+
+def _export_openvino(weights, imgsz, int8, calibration_dir):
+    from ultralytics import YOLO
+    
+    # OpenVINO exports have a static input shape, so imgsz is part of the artifact name
+    suffix = '_int8_openvino_model' if int8 else '_openvino_model'
+    export_dir = f"{os.path.splitext(weights)[0]}_{imgsz}{suffix}"
+    if _is_fresh(export_dir, weights):
+        return export_dir
+    
+    print(f"📦 Exporting {weights} to OpenVINO{' INT8' if int8 else ''}...")
+    model = YOLO(weights)
+    if not int8:
+        exported = model.export(format='openvino', imgsz=imgsz)
+    else:
+        # Calibrate on our own images through a throwaway dataset description
+        images_dir = os.path.abspath(calibration_dir)
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+            f.write(f"path: {images_dir}\ntrain: .\nval: .\n")
+            f.write("names:\n" + ''.join(f"  {i}: '{name}'\n" for i, name in model.names.items()))
+            data_yaml = f.name
+        try:
+            exported = model.export(format='openvino', imgsz=imgsz, int8=True, data=data_yaml)
+        finally:
+            os.remove(data_yaml)
+    
+    # Keep every imgsz and the INT8 and float exports side by side
+    if os.path.abspath(exported) != os.path.abspath(export_dir):
+        if os.path.exists(export_dir):
+            import shutil
+            shutil.rmtree(export_dir)
+        os.replace(exported, export_dir)
+    return export_dir
+
+def export_model(weights='yolov8n.pt', backend='onnx', imgsz=640, calibration_dir='data'):
+    """Return a model path loadable by YOLO() for the backend, exporting if needed"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend == 'pytorch':
+        return weights
+    if not os.path.exists(weights):
+        raise FileNotFoundError(f"Export needs local weights: {weights}")
+    
+    if backend == 'onnx':
+        return _export_onnx(weights, imgsz)
+    if backend == 'onnx-int8':
+        return _quantize_onnx(_export_onnx(weights, imgsz), weights, imgsz, calibration_dir)
+    return _export_openvino(weights, imgsz, backend == 'openvino-int8', calibration_dir)
+
+def compare_backends(weights='yolov8n.pt', backends=BACKENDS, images=None, imgsz=640, calibration_dir='data'):
+    """Count agreement and speed of each backend against the PyTorch baseline"""
+    from vehicle_detector import VehicleDetector
+    
+    images = images or calibration_images(calibration_dir)
+    report = {}
+    baseline = None
+    
+    for backend in ('pytorch',) + tuple(b for b in backends if b != 'pytorch'):
+        try:
+            detector = VehicleDetector(weights, imgsz=imgsz, backend=backend, calibration_dir=calibration_dir)
+        except Exception as e:
+            print(f"❌ Backend {backend} unavailable: {e}")
+            continue
+        
+        start = time.perf_counter()
+        counts = np.array([detector.detect_vehicles(path) for path in images])
+        elapsed = time.perf_counter() - start
+        
+        if baseline is None:
+            baseline = counts
+        report[backend] = {
+            'fps': len(images) / elapsed if elapsed > 0 else 0.0,
+            'agreement': float(np.mean(counts == baseline)),
+            'mean_abs_diff': float(np.mean(np.abs(counts - baseline)))
+        }
+    
+    print(f"\n{'backend':16} {'images/s':>10} {'exact agreement':>16} {'mean |Δcount|':>14}")
+    for backend, stats in report.items():
+        print(f"{backend:16} {stats['fps']:10.1f} {stats['agreement']:16.1%} {stats['mean_abs_diff']:14.2f}")
+    return report
+
+# Export every backend and compare counts with PyTorch on the dataset images
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export YOLO to CPU backends and compare with PyTorch')
+    parser.add_argument('--weights', default='yolov8n.pt')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=['onnx', 'onnx-int8'])
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--calibration-dir', default=os.path.join(os.path.dirname(__file__), '..', 'data'))
+    args = parser.parse_args()
+    
+    compare_backends(args.weights, tuple(args.backends), imgsz=args.imgsz, calibration_dir=args.calibration_dir)
\ No newline at end of file
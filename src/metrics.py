@@ -0,0 +1,120 @@
+import os
+import time
+import bisect
+import functools
+import threading
+
+# Latency bucket upper bounds in seconds (fixed, so memory per stage never grows)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = os.environ.get('TRAFFIC_METRICS', '') not in ('', '0')
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+class Histogram:
+    """Fixed-bucket latency histogram for one stage"""
+    
+    def __init__(self):
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, seconds):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.total += seconds
+            self.count += 1
+
+class StageMetrics:
+    """Per-stage latency histograms, exposed in Prometheus text format"""
+    
+    def __init__(self, name='traffic_stage_seconds', help_text='Latency of detection and signal planning stages'):
+        self.name = name
+        self.help_text = help_text
+        self.stages = {}
+        self._lock = threading.Lock()
+    
+    def histogram(self, stage):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(stage, Histogram())
+        return histogram
+    
+    def observe(self, stage, seconds):
+        self.histogram(stage).observe(seconds)
+    
+    def render_prometheus(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for stage, histogram in sorted(self.stages.items()):
+            with histogram._lock:
+                bucket_counts = list(histogram.bucket_counts)
+                total, count = histogram.total, histogram.count
+            
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+# Global registry shared by the detector, controller and dashboard
+STAGES = StageMetrics()
+
+class _StageTimer:
+    __slots__ = ('stage', 'start')
+    
+    def __init__(self, stage):
+        self.stage = stage
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        STAGES.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def stage(name):
+    """Context manager timing a block into the stage histogram (a shared no-op when disabled)"""
+    return _StageTimer(name) if _enabled else _NULL_TIMER
+
+def timed(name):
+    """Decorator timing every call of a function into the stage histogram"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                STAGES.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
\ No newline at end of file
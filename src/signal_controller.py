@@ -1,26 +1,39 @@
 import time
 import json
+
+import metrics
+from cycle_history import CycleHistory
 from datetime import datetime
 
 class TrafficSignalController:
-    def __init__(self):
+    def __init__(self, history=None, split_optimizer=None):
         # Realistic signal timing parameters (in seconds)
         self.total_cycle_time = 90      # Fixed 90-second total cycle
         self.min_green_time = 15        # Safety minimum
         self.max_green_time = 45        # Efficiency maximum
         self.yellow_time = 4            # Standard yellow time
         self.all_red_time = 1           # Safety buffer between phases
+        # Fixed-time baseline green per approach for efficiency (None: equal share of the cycle)
+        self.fixed_green_time = None
         
         # Current signal state
         self.current_green = None
         self.signal_start_time = 0
-        self.cycle_data = []
+        # Bounded cycle history (memory-only unless a log path is given)
+        self.cycle_data = history if history is not None else CycleHistory()
+        # Optional SplitOptimizer choosing cycle length and splits for least delay
+        self.split_optimizer = split_optimizer
         
         print("🚦 Traffic Signal Controller Initialized!")
         print(f"   Total Cycle: {self.total_cycle_time}s | Green Range: {self.min_green_time}-{self.max_green_time}s")
     
+    @metrics.timed('controller_green_times')
     def calculate_green_times(self, camera_counts):
         """Calculate green times with fixed 90-second total cycle"""
+        if self.split_optimizer is not None:
+            return self.split_optimizer.green_times(camera_counts, self.min_green_time, self.max_green_time,
+                                                    self.yellow_time, self.all_red_time)
+        
         num_cameras = len(camera_counts)
         total_vehicles = sum(camera_counts.values())
         
@@ -64,6 +77,109 @@ class TrafficSignalController:
         
         return limited_times
     
+    def _intersection_param(self, value, default, num_intersections):
+        """Broadcast a scalar or per-intersection timing parameter to shape (N,)"""
+        import numpy as np
+        
+        value = default if value is None else value
+        return np.broadcast_to(np.asarray(value), (num_intersections,))
+    
+    @metrics.timed('controller_green_times_batch')
+    def calculate_green_times_batch(self, counts, total_cycle_time=None, min_green_time=None,
+                                    max_green_time=None, yellow_time=None, all_red_time=None):
+        """Plan many intersections at once from an (N intersections x K approaches) count array
+        
+        Timing parameters default to this controller's settings and may be scalars or
+        arrays of length N. Returns a dict of arrays: green_times (N, K), phase_orders
+        (N, K, approach indices busiest first), phase_times (N, K) and efficiencies (N,),
+        matching calculate_green_times / get_next_signal_sequence / calculate_efficiency.
+        This is always the proportional planner, even with a split_optimizer.
+        """
+        # NumPy is only needed here, so controller-only tools start without it
+        import numpy as np
+        
+        counts = np.asarray(counts)
+        if counts.ndim != 2:
+            raise ValueError(f"counts must be a 2D (intersections x approaches) array, got shape {counts.shape}")
+        num_intersections, num_approaches = counts.shape
+        
+        cycle = self._intersection_param(total_cycle_time, self.total_cycle_time, num_intersections)
+        min_green = self._intersection_param(min_green_time, self.min_green_time, num_intersections)[:, None]
+        max_green = self._intersection_param(max_green_time, self.max_green_time, num_intersections)[:, None]
+        yellow = self._intersection_param(yellow_time, self.yellow_time, num_intersections)
+        all_red = self._intersection_param(all_red_time, self.all_red_time, num_intersections)
+        integer_params = all(np.issubdtype(param.dtype, np.integer)
+                             for param in (cycle, min_green, max_green, yellow, all_red))
+        
+        # Sum approaches column by column so float results match the scalar path exactly
+        total_vehicles = np.zeros(num_intersections, dtype=counts.dtype)
+        for k in range(num_approaches):
+            total_vehicles = total_vehicles + counts[:, k]
+        no_traffic = total_vehicles == 0
+        
+        # Proportional split of the available green time, then min/max limits
+        available = (cycle - num_approaches * (yellow + all_red))[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = counts / np.where(no_traffic, 1, total_vehicles)[:, None]
+        limited = np.maximum(min_green, np.minimum(max_green, available * ratio))
+        
+        total_calculated = np.zeros(num_intersections)
+        for k in range(num_approaches):
+            total_calculated = total_calculated + limited[:, k]
+        
+        # Scale down proportionally where the limits overflow the available green time
+        overflow = (total_calculated > available[:, 0])[:, None]
+        scale_factor = available / np.where(overflow[:, 0], total_calculated, 1)[:, None]
+        green_times = np.where(overflow,
+                               np.maximum(min_green, np.rint(limited * scale_factor)),
+                               np.rint(limited))
+        
+        # Equal time when no traffic
+        equal_time = np.maximum(min_green, np.minimum(max_green, (cycle // num_approaches)[:, None]))
+        green_times = np.where(no_traffic[:, None], equal_time, green_times)
+        if integer_params:
+            green_times = green_times.astype(np.int64)
+        
+        # Busiest approach first, ties keep their original order
+        phase_orders = np.argsort(-counts, axis=1, kind='stable')
+        phase_times = green_times + yellow[:, None] + all_red[:, None]
+        efficiencies = self._calculate_efficiency_batch(counts, phase_orders, phase_times,
+                                                        total_vehicles, cycle, yellow, all_red)
+        
+        return {
+            'green_times': green_times,
+            'phase_orders': phase_orders,
+            'phase_times': phase_times,
+            'efficiencies': efficiencies
+        }
+    
+    def _calculate_efficiency_batch(self, counts, phase_orders, phase_times, total_vehicles, cycle, yellow, all_red):
+        """Vectorized calculate_efficiency over intersections, in the same summation order"""
+        import numpy as np
+        
+        num_intersections, num_approaches = counts.shape
+        ordered_counts = np.take_along_axis(counts, phase_orders, axis=1)
+        ordered_phase_times = np.take_along_axis(phase_times, phase_orders, axis=1)
+        
+        # Vehicles wait during other phases: the whole cycle minus their own phase
+        cycle_time = np.zeros(num_intersections, dtype=ordered_phase_times.dtype)
+        for k in range(num_approaches):
+            cycle_time = cycle_time + ordered_phase_times[:, k]
+        adaptive_waiting = np.zeros(num_intersections)
+        for k in range(num_approaches):
+            adaptive_waiting = adaptive_waiting + ordered_counts[:, k] * (cycle_time - ordered_phase_times[:, k])
+        
+        # Fixed system waiting time (equal green for each, during the other phases)
+        # Each intersection's own cycle sets its baseline, as it would for a scalar controller
+        fixed_phase_time = self._fixed_green(num_approaches, cycle) + yellow + all_red
+        fixed_waiting = total_vehicles * ((num_approaches - 1) * fixed_phase_time)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            efficiency = (1 - (adaptive_waiting / fixed_waiting)) * 100
+        efficiency = np.maximum(0, np.minimum(100, efficiency))
+        return np.where((total_vehicles == 0) | (fixed_waiting == 0), 100.0, efficiency)
+    
+    @metrics.timed('controller_signal_sequence')
     def get_next_signal_sequence(self, camera_counts):
         """Determine the optimal signal sequence (busiest first)"""
         green_times = self.calculate_green_times(camera_counts)
@@ -132,28 +248,37 @@ class TrafficSignalController:
         self.cycle_data.append(cycle_info)
         return cycle_info
     
+    def _fixed_green(self, num_approaches, total_cycle_time=None):
+        """Green per approach of the fixed-time system we compare against"""
+        if self.fixed_green_time is not None:
+            return self.fixed_green_time
+        if total_cycle_time is None:
+            total_cycle_time = self.total_cycle_time
+        return total_cycle_time / num_approaches  # 22.5s for 90s / 4 cameras
+    
+    @metrics.timed('controller_efficiency')
     def calculate_efficiency(self, camera_counts, sequence):
-        """Calculate timing efficiency compared to fixed system"""
+        """Calculate timing efficiency compared to fixed system
+        
+        Linear in the number of phases. Callers score each plan once and keep the result
+        with it (cycle_info['efficiency']) rather than asking again.
+        """
         total_vehicles = sum(camera_counts.values())
         
         if total_vehicles == 0:
             return 100.0
         
-        # Our adaptive system waiting time
+        # Our adaptive system waiting time: vehicles wait during the other phases,
+        # i.e. the whole cycle minus their own phase
+        cycle_time = sum(phase['phase_time'] for phase in sequence)
         adaptive_waiting = 0
         for phase in sequence:
-            camera = phase['camera']
-            count = camera_counts[camera]
-            # Vehicles wait during other phases
-            other_phases_time = sum(p['phase_time'] for p in sequence if p['camera'] != camera)
-            adaptive_waiting += count * other_phases_time
-        
-        # Fixed system waiting time (equal 22.5s green for each)
-        fixed_green = 22.5  # 90s total / 4 cameras
-        fixed_phase_time = fixed_green + self.yellow_time + self.all_red_time
-        fixed_waiting = 0
-        for count in camera_counts.values():
-            fixed_waiting += count * (3 * fixed_phase_time)  # Wait during other 3 phases
+            adaptive_waiting += camera_counts[phase['camera']] * (cycle_time - phase['phase_time'])
+        
+        # Fixed system waiting time (equal green for each, waiting during the other phases)
+        num_approaches = len(camera_counts)
+        fixed_phase_time = self._fixed_green(num_approaches) + self.yellow_time + self.all_red_time
+        fixed_waiting = total_vehicles * ((num_approaches - 1) * fixed_phase_time)
         
         if fixed_waiting == 0:
             return 100.0
@@ -171,4 +296,47 @@ class TrafficSignalController:
         print(f"\n   Phase Details:")
         for i, phase in enumerate(cycle_info['sequence']):
             print(f"   {i+1}. {phase['camera']}: {phase['vehicle_count']} vehicles → "
-                  f"{phase['green_time']}s green (+{self.yellow_time}s yellow + {self.all_red_time}s red)")
\ No newline at end of file
+                  f"{phase['green_time']}s green (+{self.yellow_time}s yellow + {self.all_red_time}s red)")
+
+
+# Consistency check: the batch planner must match the scalar path exactly,
+# including per-intersection cycle, min green and yellow times
+if __name__ == "__main__":
+    import random
+    import contextlib
+    import io
+    import numpy as np
+    
+    rng = random.Random(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch_controller = TrafficSignalController()
+        scalar_controller = TrafficSignalController()
+    
+    mismatches = 0
+    trials = 0
+    for num_approaches in (2, 4, 6, 8):
+        for fixed_green_time in (None, 20.0):
+            counts = [[rng.randint(0, 40) for _ in range(num_approaches)] for _ in range(200)]
+            cycles = [rng.choice([60, 90, 120]) for _ in counts]
+            min_greens = [rng.choice([10, 15]) for _ in counts]
+            yellows = [rng.choice([3, 4]) for _ in counts]
+            
+            batch_controller.fixed_green_time = fixed_green_time
+            batch = batch_controller.calculate_green_times_batch(np.array(counts), total_cycle_time=np.array(cycles),
+                                                                 min_green_time=np.array(min_greens),
+                                                                 yellow_time=np.array(yellows))
+            for i, row in enumerate(counts):
+                scalar_controller.total_cycle_time = cycles[i]
+                scalar_controller.min_green_time = min_greens[i]
+                scalar_controller.yellow_time = yellows[i]
+                scalar_controller.fixed_green_time = fixed_green_time
+                
+                camera_counts = {f'camera_{k + 1}': count for k, count in enumerate(row)}
+                sequence = scalar_controller.get_next_signal_sequence(camera_counts)
+                green_times = [batch['green_times'][i][k] for k in batch['phase_orders'][i]]
+                trials += 1
+                if ([phase['green_time'] for phase in sequence] != green_times
+                        or scalar_controller.calculate_efficiency(camera_counts, sequence) != batch['efficiencies'][i]):
+                    mismatches += 1
+    
+    print(f"{'✅' if mismatches == 0 else '❌'} Batch vs scalar planner: {mismatches}/{trials} mismatches")
\ No newline at end of file
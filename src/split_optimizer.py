@@ -0,0 +1,109 @@
+import collections
+import numpy as np
+
+class SplitOptimizer:
+    """Webster-style cycle length and green split optimizer with an LRU cache
+    
+    Counts are read as the vehicles arriving on each approach per count_period seconds.
+    For every candidate cycle length it builds candidate splits between equal and
+    flow-proportional and scores them all at once with Webster's delay formula. It
+    then keeps the split with the least total vehicle delay that satisfies the
+    min/max green limits. Results are memoized by the quantized count vector, so a
+    repeated traffic state costs one dictionary lookup.
+    """
+    
+    def __init__(self, saturation_headway=2.0, count_period=90.0, max_cycle=120, cycle_step=5,
+                 quantum=1, cache_size=4096):
+        # Seconds per vehicle discharged from a standing queue on green
+        self.saturation_flow = 1.0 / saturation_headway
+        self.count_period = count_period
+        self.max_cycle = max_cycle
+        self.cycle_step = cycle_step
+        # Counts are rounded to multiples of quantum before optimizing and caching
+        # (coarser quanta trade a little precision for more cache hits)
+        self.quantum = quantum
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+        # Split shapes: green proportional to flow ** exponent (0 = equal, 1 = Webster)
+        self.exponents = np.linspace(0.0, 2.0, 9)
+    
+    def green_times(self, camera_counts, min_green_time, max_green_time, yellow_time, all_red_time):
+        """Delay-minimizing integer green times per camera, like calculate_green_times"""
+        cameras = list(camera_counts)
+        quantized = tuple(int(round(camera_counts[camera] / self.quantum)) for camera in cameras)
+        key = (quantized, min_green_time, max_green_time, yellow_time, all_red_time)
+        
+        greens = self.cache.get(key)
+        if greens is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+        else:
+            self.misses += 1
+            counts = np.array(quantized, dtype=float) * self.quantum
+            greens = self.optimize(counts, min_green_time, max_green_time, yellow_time + all_red_time)
+            self.cache[key] = greens
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        
+        return dict(zip(cameras, greens))
+    
+    def delay(self, greens, cycles, flows):
+        """Total Webster delay (vehicle-seconds per second) of (M, K) candidate splits"""
+        capacity_share = greens / cycles[:, None]
+        saturation = np.divide(flows, self.saturation_flow * capacity_share,
+                               out=np.zeros_like(greens), where=capacity_share > 0)
+        
+        # Uniform delay of a vehicle arriving at random in the cycle
+        uniform = cycles[:, None] * (1 - capacity_share) ** 2 / (2 * (1 - np.minimum(saturation, 1) * capacity_share))
+        # Random-arrival term, capped near saturation; beyond it the queue keeps growing
+        # over the counting period (the deterministic oversaturation delay)
+        capped = np.minimum(saturation, 0.95)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            random = np.where(flows > 0, capped ** 2 / (2 * flows * (1 - capped)), 0.0)
+        overflow = np.maximum(saturation - 0.95, 0) * self.count_period / 2
+        return np.sum(flows * (uniform + random + overflow), axis=1)
+    
+    def optimize(self, counts, min_green, max_green, phase_lost_time):
+        """Search cycle lengths and split shapes for the least total delay; returns integer greens"""
+        num_approaches = len(counts)
+        flows = counts / self.count_period
+        
+        min_cycle = num_approaches * (min_green + phase_lost_time)
+        max_cycle = min(self.max_cycle, num_approaches * (max_green + phase_lost_time))
+        cycles = np.arange(min_cycle, max(min_cycle, max_cycle) + 1, self.cycle_step, dtype=float)
+        
+        # Every (cycle, split shape) pair is one candidate row
+        weights = np.where(flows > 0, flows, 0.0)[None, :] ** self.exponents[:, None]
+        weights = np.where(np.isfinite(weights), weights, 0.0)
+        weights[weights.sum(axis=1) == 0] = 1.0
+        cycle_grid = np.repeat(cycles, len(self.exponents))
+        weight_grid = np.tile(weights, (len(cycles), 1))
+        
+        greens = self._fill(weight_grid, cycle_grid - num_approaches * phase_lost_time, min_green, max_green)
+        best = int(np.argmin(self.delay(greens, cycle_grid, flows[None, :])))
+        return tuple(int(green) for green in greens[best])
+    
+    def _fill(self, weights, available, min_green, max_green):
+        """Integer splits proportional to weights, within [min, max] and summing to available"""
+        # Bisect the scale so that sum(clip(scale * weights)) hits the available green time
+        low = np.zeros(len(weights))
+        smallest_weight = np.where(weights > 0, weights, np.inf).min(axis=1)
+        high = available.max() / smallest_weight
+        for _ in range(60):
+            scale = (low + high) / 2
+            too_much = np.clip(scale[:, None] * weights, min_green, max_green).sum(axis=1) > available
+            high = np.where(too_much, scale, high)
+            low = np.where(too_much, low, scale)
+        greens = np.clip(low[:, None] * weights, min_green, max_green)
+        
+        # Largest-remainder rounding keeps the total exact
+        floors = np.floor(greens)
+        shortfall = np.rint(available - floors.sum(axis=1)).astype(int)
+        order = np.argsort(-(greens - floors), axis=1, kind='stable')
+        bonus = np.zeros_like(floors)
+        np.put_along_axis(bonus, order, (np.arange(weights.shape[1])[None, :] < shortfall[:, None]).astype(float),
+                          axis=1)
+        return np.minimum(floors + bonus, max_green)
\ No newline at end of file
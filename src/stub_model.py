@@ -0,0 +1,86 @@
+import os
+import time
+import zlib
+import cv2
+import numpy as np
+
+# COCO class names as used by yolov8n.pt (only the ids matter to VehicleDetector)
+COCO_NAMES = {0: 'person', 1: 'bicycle', 2: 'car', 3: 'motorcycle', 5: 'bus', 7: 'truck', 9: 'traffic light'}
+
+class _Tensor:
+    """Just enough of a torch tensor for result.boxes.<attr>.cpu().numpy()"""
+    
+    def __init__(self, array):
+        self.array = array
+    
+    def cpu(self):
+        return self
+    
+    def numpy(self):
+        return self.array
+    
+    def __len__(self):
+        return len(self.array)
+
+class _Boxes:
+    def __init__(self, data):
+        self.data = _Tensor(data)
+        self.xyxy = _Tensor(data[:, :4])
+        self.conf = _Tensor(data[:, 4])
+        self.cls = _Tensor(data[:, 5])
+    
+    def __len__(self):
+        return len(self.data)
+
+class _Result:
+    def __init__(self, data, orig_shape, names):
+        self.boxes = _Boxes(data)
+        self.orig_shape = orig_shape
+        self.names = names
+
+class StubYOLO:
+    """Deterministic stand-in for ultralytics.YOLO that needs no weights, network or GPU
+    
+    Boxes are derived from a checksum of the image, so the same image always gives
+    the same detections. latency adds a fixed per-image cost to mimic inference.
+    """
+    
+    def __init__(self, latency=0.0, max_boxes=30):
+        self.names = dict(COCO_NAMES)
+        self.latency = latency
+        self.max_boxes = max_boxes
+        self._class_ids = np.array(list(self.names.keys()), dtype=np.float32)
+    
+    def _load(self, source):
+        if isinstance(source, str):
+            if not os.path.exists(source):
+                raise FileNotFoundError(source)
+            image = cv2.imread(source)
+            if image is None:
+                raise ValueError(f"Could not decode {source}")
+            return image
+        return np.asarray(source)
+    
+    def _predict(self, image, conf=0.25):
+        height, width = image.shape[:2]
+        rng = np.random.default_rng(zlib.crc32(np.ascontiguousarray(image[::8, ::8]).tobytes()))
+        num_boxes = int(rng.integers(0, self.max_boxes + 1))
+        
+        corners = rng.uniform(0, 1, (num_boxes, 2)) * [width, height]
+        sizes = rng.uniform(0.03, 0.15, (num_boxes, 2)) * [width, height]
+        data = np.empty((num_boxes, 6), dtype=np.float32)
+        data[:, 0:2] = corners
+        data[:, 2:4] = np.minimum(corners + sizes, [width, height])
+        data[:, 4] = rng.uniform(0.05, 1.0, num_boxes)
+        data[:, 5] = rng.choice(self._class_ids, num_boxes)
+        return data[data[:, 4] >= conf]
+    
+    def __call__(self, source, conf=0.25, **kwargs):
+        sources = source if isinstance(source, list) else [source]
+        results = []
+        for item in sources:
+            image = self._load(item)
+            if self.latency:
+                time.sleep(self.latency)
+            results.append(_Result(self._predict(image, conf), image.shape[:2], self.names))
+        return results
\ No newline at end of file
@@ -0,0 +1,280 @@
+import time
+import heapq
+import random
+from collections import deque
+
+from cycle_history import RunningStats
+
+# Event kinds, ordered so simultaneous events resolve signal changes before traffic
+PHASE_START = 0
+YELLOW_START = 1
+ALL_RED_START = 2
+DISCHARGE = 3
+ARRIVAL = 4
+
+class TrafficSimulator:
+    """Discrete-event intersection simulator driven by a virtual clock
+    
+    Vehicles arrive on each approach as a Poisson process and join a queue. The
+    green approach discharges one vehicle per saturation headway. Each cycle is
+    planned by controller.get_next_signal_sequence from the current queue lengths.
+    Only the last max_log cycles and phases are kept; totals and averages cover the whole run.
+    """
+    
+    def __init__(self, controller, arrival_rates, saturation_headway=2.0, initial_queues=None, seed=None,
+                 max_log=1000):
+        self.controller = controller
+        # Vehicles per second per approach, either a dict or a callable(t) -> dict
+        self.arrival_rates = arrival_rates
+        self.saturation_headway = saturation_headway
+        self.random = random.Random(seed)
+        
+        rates = self._rates_at(0.0)
+        self.approaches = list(rates.keys())
+        self.queues = {approach: deque() for approach in self.approaches}
+        for approach, count in (initial_queues or {}).items():
+            self.queues[approach].extend([0.0] * count)
+        
+        # Virtual clock and event heap of (time, kind, seq, payload)
+        self.now = 0.0
+        self._events = []
+        self._seq = 0
+        
+        # Signal state
+        self.sequence = []
+        self.phase_index = -1
+        self.current_green = None
+        self.signal_state = 'ALL RED'
+        self._discharging = {approach: False for approach in self.approaches}
+        self._last_discharge = {approach: float('-inf') for approach in self.approaches}
+        
+        # Statistics: bounded recent logs, so memory stays flat on endless live runs
+        self.phase_log = deque(maxlen=max_log)
+        self.cycle_log = deque(maxlen=max_log)
+        self.phases = 0
+        self.cycle_stats = RunningStats()
+        self.total_delay = {approach: 0.0 for approach in self.approaches}
+        self.departures = {approach: 0 for approach in self.approaches}
+        self.arrivals = {approach: 0 for approach in self.approaches}
+        self.max_queue = {approach: len(self.queues[approach]) for approach in self.approaches}
+    
+    def _rates_at(self, t):
+        if callable(self.arrival_rates):
+            return self.arrival_rates(t)
+        return self.arrival_rates
+    
+    def _schedule(self, t, kind, payload=None):
+        heapq.heappush(self._events, (t, kind, self._seq, payload))
+        self._seq += 1
+    
+    def _schedule_arrival(self, approach):
+        rate = self._rates_at(self.now).get(approach, 0)
+        if rate > 0:
+            self._schedule(self.now + self.random.expovariate(rate), ARRIVAL, approach)
+        else:
+            # Check again in a minute in case time-varying demand picks up
+            self._schedule(self.now + 60.0, ARRIVAL, (approach, False))
+    
+    def queue_lengths(self):
+        return {approach: len(queue) for approach, queue in self.queues.items()}
+    
+    def _start_cycle(self):
+        camera_counts = self.queue_lengths()
+        self.sequence = self.controller.get_next_signal_sequence(camera_counts)
+        self.phase_index = 0
+        cycle_info = {
+            'start_time': self.now,
+            'camera_counts': camera_counts,
+            'total_cycle_time': sum(phase['phase_time'] for phase in self.sequence),
+            'efficiency': self.controller.calculate_efficiency(camera_counts, self.sequence)
+        }
+        self.cycle_log.append(cycle_info)
+        self.cycle_stats.add(cycle_info)
+        self._schedule(self.now, PHASE_START)
+    
+    def _start_discharge(self, approach):
+        if not self._discharging[approach] and self.queues[approach]:
+            self._discharging[approach] = True
+            start = max(self.now, self._last_discharge[approach] + self.saturation_headway)
+            self._schedule(start, DISCHARGE, (approach, self.phases))
+    
+    def _handle(self, kind, payload):
+        if kind == ARRIVAL:
+            if isinstance(payload, tuple):
+                self._schedule_arrival(payload[0])
+                return False
+            queue = self.queues[payload]
+            queue.append(self.now)
+            self.arrivals[payload] += 1
+            self.max_queue[payload] = max(self.max_queue[payload], len(queue))
+            if self.signal_state == 'GREEN' and self.current_green == payload:
+                self._start_discharge(payload)
+            self._schedule_arrival(payload)
+            return False
+        
+        if kind == DISCHARGE:
+            # Discharges are tagged with their phase so stale ones from an earlier green are dropped
+            approach, phase_number = payload
+            if phase_number != self.phases:
+                return False
+            queue = self.queues[approach]
+            if self.signal_state != 'GREEN' or self.current_green != approach or not queue:
+                self._discharging[approach] = False
+                return False
+            arrival_time = queue.popleft()
+            self.total_delay[approach] += self.now - arrival_time
+            self.departures[approach] += 1
+            self._last_discharge[approach] = self.now
+            phase = self.phase_log[-1]
+            phase['discharged'] += 1
+            phase['delay'] += self.now - arrival_time
+            self._schedule(self.now + self.saturation_headway, DISCHARGE, payload)
+            return False
+        
+        if kind == PHASE_START:
+            phase = self.sequence[self.phase_index]
+            self.current_green = phase['camera']
+            self.signal_state = 'GREEN'
+            self.phases += 1
+            self.phase_log.append({
+                'start_time': self.now,
+                'camera': phase['camera'],
+                'green_time': phase['green_time'],
+                'queue_at_start': len(self.queues[phase['camera']]),
+                'queue_at_end': None,
+                'discharged': 0,
+                'delay': 0.0
+            })
+            self._discharging[self.current_green] = False
+            self._start_discharge(self.current_green)
+            self._schedule(self.now + phase['green_time'], YELLOW_START)
+            return True
+        
+        if kind == YELLOW_START:
+            self.signal_state = 'YELLOW'
+            self.phase_log[-1]['queue_at_end'] = len(self.queues[self.current_green])
+            self._schedule(self.now + self.controller.yellow_time, ALL_RED_START)
+            return True
+        
+        if kind == ALL_RED_START:
+            self.signal_state = 'ALL RED'
+            self.phase_index += 1
+            if self.phase_index < len(self.sequence):
+                self._schedule(self.now + self.controller.all_red_time, PHASE_START)
+            else:
+                # Replan from the queues once the all-red buffer has cleared
+                self._schedule(self.now + self.controller.all_red_time, PHASE_START, 'new_cycle')
+            return True
+        
+        return False
+    
+    def state(self):
+        """Snapshot in the shape the dashboard expects"""
+        if self.signal_state == 'GREEN':
+            current_green = self.current_green
+        elif self.signal_state == 'YELLOW':
+            current_green = f"{self.current_green} (YELLOW)"
+        else:
+            current_green = 'ALL RED'
+        
+        efficiency = self.cycle_log[-1]['efficiency'] if self.cycle_log else 0
+        return {
+            'time': self.now,
+            'vehicle_counts': self.queue_lengths(),
+            'current_green': current_green,
+            'efficiency': efficiency
+        }
+    
+    def run(self, duration=None, realtime=False, speed=1.0, on_state_change=None):
+        """Advance the virtual clock by duration seconds (forever if None)
+        
+        Headless runs process events as fast as possible. With realtime=True the
+        loop sleeps so that virtual time advances at `speed` x wall-clock time.
+        on_state_change(simulator) is called after every signal transition.
+        """
+        if not self._events:
+            for approach in self.approaches:
+                self._schedule_arrival(approach)
+            self._start_cycle()
+        
+        end_time = None if duration is None else self.now + duration
+        wall_start = time.monotonic()
+        virtual_start = self.now
+        
+        while self._events:
+            t, kind, _, payload = self._events[0]
+            if end_time is not None and t > end_time:
+                break
+            
+            if realtime:
+                delay = wall_start + (t - virtual_start) / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            
+            heapq.heappop(self._events)
+            self.now = t
+            
+            if kind == PHASE_START and payload == 'new_cycle':
+                self._start_cycle()
+                continue
+            
+            if self._handle(kind, payload) and on_state_change:
+                on_state_change(self)
+        
+        if end_time is not None:
+            self.now = end_time
+        return self.summary()
+    
+    def summary(self):
+        """Queue length and delay statistics per approach and per phase"""
+        approaches = {}
+        for approach in self.approaches:
+            departures = self.departures[approach]
+            approaches[approach] = {
+                'arrivals': self.arrivals[approach],
+                'departures': departures,
+                'queue_length': len(self.queues[approach]),
+                'max_queue': self.max_queue[approach],
+                'average_delay': self.total_delay[approach] / departures if departures else 0.0
+            }
+        
+        total_departures = sum(self.departures.values())
+        return {
+            'simulated_time': self.now,
+            'cycles': self.cycle_stats.cycles,
+            'average_delay': sum(self.total_delay.values()) / total_departures if total_departures else 0.0,
+            'average_efficiency': self.cycle_stats.mean_efficiency,
+            'average_cycle_time': self.cycle_stats.mean_cycle_time,
+            'approaches': approaches,
+            'phases': list(self.phase_log)
+        }
+    
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n📋 SIMULATION SUMMARY ({summary['simulated_time'] / 3600:.1f}h simulated, {summary['cycles']} cycles)")
+        print(f"   Average delay: {summary['average_delay']:.1f}s per vehicle | "
+              f"average cycle {summary['average_cycle_time']:.1f}s at {summary['average_efficiency']:.1f}% efficiency")
+        for approach, stats in summary['approaches'].items():
+            print(f"   {approach}: {stats['departures']}/{stats['arrivals']} vehicles served | "
+                  f"avg delay {stats['average_delay']:.1f}s | max queue {stats['max_queue']} | "
+                  f"queue now {stats['queue_length']}")
+
+# Headless 24-hour scenario
+if __name__ == "__main__":
+    import math
+    from signal_controller import TrafficSignalController
+    from split_optimizer import SplitOptimizer
+    
+    base_rates = {'camera_1': 0.12, 'camera_2': 0.04, 'camera_3': 0.08, 'camera_4': 0.06}
+    
+    def daily_demand(t):
+        # Morning and evening peaks on top of a night-time low
+        hour = (t / 3600) % 24
+        factor = 0.3 + 0.7 * math.exp(-((hour - 8) ** 2) / 4) + 0.7 * math.exp(-((hour - 17.5) ** 2) / 4)
+        return {approach: rate * factor for approach, rate in base_rates.items()}
+    
+    simulator = TrafficSimulator(TrafficSignalController(split_optimizer=SplitOptimizer()), daily_demand, seed=42)
+    start = time.perf_counter()
+    simulator.run(duration=24 * 3600)
+    print(f"⚡ Simulated 24h in {time.perf_counter() - start:.2f}s")
+    simulator.print_summary()
\ No newline at end of file
@@ -0,0 +1,226 @@
+import collections
+import numpy as np
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy box arrays"""
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+def _greedy_match(iou, threshold):
+    """Match rows to columns, best IoU first; returns (row, col) index arrays"""
+    rows, cols = np.nonzero(iou >= threshold)
+    order = np.argsort(-iou[rows, cols], kind='stable')
+    used_rows, used_cols = set(), set()
+    matches = []
+    for row, col in zip(rows[order], cols[order]):
+        if row not in used_rows and col not in used_cols:
+            used_rows.add(row)
+            used_cols.add(col)
+            matches.append((row, col))
+    matches = np.array(matches, dtype=np.int64).reshape(-1, 2)
+    return matches[:, 0], matches[:, 1]
+
+def _distance_similarity(tracks, boxes, max_jump):
+    """1 - centre distance / (max_jump track heights), between (N, 8) states and (M, 4) boxes"""
+    centres = np.column_stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2])
+    distances = np.linalg.norm(tracks[:, None, :2] - centres[None, :, :], axis=2)
+    return 1 - distances / (max_jump * np.maximum(tracks[:, 3:4], 1.0))
+
+def _xyxy_to_cxcywh(boxes):
+    return np.column_stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2,
+                            boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]])
+
+def _cxcywh_to_xyxy(states):
+    half = states[:, 2:4] / 2
+    return np.column_stack([states[:, :2] - half, states[:, :2] + half])
+
+class VehicleTracker:
+    """ByteTrack-style IoU tracker with a constant-velocity Kalman filter, for one approach
+    
+    Call update() with detect_boxes output on inference frames and predict() on the
+    frames in between, so YOLO only has to run every Nth frame. Confirmed tracks keep
+    persistent IDs; their appearances and disappearances give arrival and discharge rates.
+    """
+    
+    def __init__(self, high_conf=0.5, low_conf=0.1, iou_threshold=0.3, min_hits=2,
+                 max_misses=3, max_jump=2.0, stopped_speed=0.2, rate_window=60.0):
+        # Two-stage association: confident boxes first, weak ones only extend existing tracks
+        self.high_conf = high_conf
+        self.low_conf = low_conf
+        self.iou_threshold = iou_threshold
+        # Hits before a track counts as a vehicle, inference misses before it is dropped
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        # Centre-distance fallback (in box heights) for fast vehicles at low frame rates
+        self.max_jump = max_jump
+        # Below this speed (box heights per second) a vehicle counts as queued
+        self.stopped_speed = stopped_speed
+        self.rate_window = rate_window
+        
+        # Per-track arrays: state is [cx, cy, w, h, vx, vy, vw, vh]
+        self.states = np.zeros((0, 8))
+        self.covariances = np.zeros((0, 8, 8))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.classes = np.zeros(0)
+        self.scores = np.zeros(0)
+        self.hits = np.zeros(0, dtype=np.int64)
+        self.misses = np.zeros(0, dtype=np.int64)
+        
+        self.next_id = 1
+        self.first_time = None
+        self.last_time = None
+        self.arrivals = collections.deque()
+        self.discharges = collections.deque()
+    
+    def __len__(self):
+        return int(np.count_nonzero(self.hits >= self.min_hits))
+    
+    def _noise(self, heights, position_scale, velocity_scale):
+        """Diagonal noise covariances scaled by box height, as in ByteTrack"""
+        std = np.column_stack([heights * position_scale] * 4 + [heights * velocity_scale] * 4)
+        std[:, [2, 6]] = std[:, [3, 7]]
+        return np.einsum('ni,ij->nij', np.maximum(std, 1e-3) ** 2, np.eye(8))
+    
+    def _advance(self, timestamp):
+        """Move every track forward to timestamp with the constant-velocity model"""
+        if self.first_time is None:
+            self.first_time = timestamp
+        dt = 0.0 if self.last_time is None else max(0.0, timestamp - self.last_time)
+        self.last_time = timestamp
+        if not len(self.states) or dt == 0:
+            return
+        
+        transition = np.eye(8)
+        transition[:4, 4:] = np.eye(4) * dt
+        self.states = self.states @ transition.T
+        # Keep boxes from collapsing when the size velocity overshoots
+        self.states[:, 2:4] = np.maximum(self.states[:, 2:4], 1.0)
+        process_noise = self._noise(self.states[:, 3], 0.05 * dt, 0.00625 * dt)
+        self.covariances = transition @ self.covariances @ transition.T + process_noise
+    
+    def _correct(self, indices, boxes):
+        """Kalman update of the given tracks with matched xyxy boxes"""
+        measurements = _xyxy_to_cxcywh(boxes)
+        states = self.states[indices]
+        covariances = self.covariances[indices]
+        
+        innovation_cov = covariances[:, :4, :4] + self._noise(states[:, 3], 0.05, 0)[:, :4, :4]
+        gain = covariances[:, :, :4] @ np.linalg.inv(innovation_cov)
+        self.states[indices] = states + np.einsum('nij,nj->ni', gain, measurements - states[:, :4])
+        self.covariances[indices] = covariances - gain @ covariances[:, :4, :]
+    
+    def _add_tracks(self, boxes):
+        measurements = _xyxy_to_cxcywh(boxes[:, :4])
+        count = len(boxes)
+        self.states = np.vstack([self.states, np.column_stack([measurements, np.zeros((count, 4))])])
+        # Unknown velocity starts with a wide prior
+        self.covariances = np.concatenate([self.covariances,
+                                           self._noise(measurements[:, 3], 0.1, 0.4)])
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + count)])
+        self.next_id += count
+        self.classes = np.concatenate([self.classes, boxes[:, 5]])
+        self.scores = np.concatenate([self.scores, boxes[:, 4]])
+        self.hits = np.concatenate([self.hits, np.ones(count, dtype=np.int64)])
+        self.misses = np.concatenate([self.misses, np.zeros(count, dtype=np.int64)])
+    
+    def _keep(self, mask):
+        for name in ('states', 'covariances', 'ids', 'classes', 'scores', 'hits', 'misses'):
+            setattr(self, name, getattr(self, name)[mask])
+    
+    def _trim_rates(self):
+        cutoff = self.last_time - self.rate_window
+        for events in (self.arrivals, self.discharges):
+            while events and events[0] < cutoff:
+                events.popleft()
+    
+    def predict(self, timestamp):
+        """Advance tracks without a detection (a skipped frame) and return the track boxes"""
+        self._advance(timestamp)
+        return self.tracks()
+    
+    def update(self, boxes, timestamp):
+        """Associate an (N, 6) detect_boxes array taken at timestamp and return the track boxes"""
+        self._advance(timestamp)
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+        boxes = boxes[boxes[:, 4] >= self.low_conf]
+        high = boxes[boxes[:, 4] >= self.high_conf]
+        low = boxes[boxes[:, 4] < self.high_conf]
+        
+        predicted = _cxcywh_to_xyxy(self.states)
+        matched = np.zeros(len(self.states), dtype=bool)
+        
+        # First stage: confident detections against every track
+        rows, cols = _greedy_match(iou_matrix(predicted, high[:, :4]), self.iou_threshold)
+        self._correct(rows, high[cols, :4])
+        self.scores[rows] = high[cols, 4]
+        matched[rows] = True
+        unmatched_high = np.setdiff1d(np.arange(len(high)), cols)
+        
+        # Second stage: weak detections (often occluded vehicles) rescue the leftover tracks
+        remaining = np.flatnonzero(~matched)
+        rows, cols = _greedy_match(iou_matrix(predicted[remaining], low[:, :4]), self.iou_threshold)
+        self._correct(remaining[rows], low[cols, :4])
+        matched[remaining[rows]] = True
+        
+        # Third stage: boxes that moved too far to overlap their prediction, nearest first
+        remaining = np.flatnonzero(~matched)
+        similarity = _distance_similarity(self.states[remaining], high[unmatched_high, :4], self.max_jump)
+        rows, cols = _greedy_match(similarity, 1e-9)
+        self._correct(remaining[rows], high[unmatched_high[cols], :4])
+        matched[remaining[rows]] = True
+        unmatched_high = np.delete(unmatched_high, cols)
+        
+        was_confirmed = self.hits >= self.min_hits
+        self.hits[matched] += 1
+        self.misses[matched] = 0
+        self.misses[~matched] += 1
+        
+        for _ in range(np.count_nonzero(~was_confirmed & (self.hits >= self.min_hits))):
+            self.arrivals.append(timestamp)
+        # Tentative tracks get no second chance
+        lost = (self.misses > self.max_misses) | (~was_confirmed & (self.misses > 0))
+        # Confirmed vehicles that vanish have left the approach; unconfirmed ones were noise
+        for _ in range(np.count_nonzero(lost & (self.hits >= self.min_hits))):
+            self.discharges.append(timestamp)
+        self._keep(~lost)
+        
+        # Only confident detections may start new tracks
+        self._add_tracks(high[unmatched_high])
+        self._trim_rates()
+        return self.tracks()
+    
+    def tracks(self):
+        """Confirmed tracks as an (N, 6) array of x1, y1, x2, y2, track_id, class_id"""
+        confirmed = self.hits >= self.min_hits
+        return np.column_stack([_cxcywh_to_xyxy(self.states[confirmed]),
+                                self.ids[confirmed], self.classes[confirmed]])
+    
+    def flow(self):
+        """Current vehicles, queued (stopped) vehicles and arrival/discharge rates in vehicles/min"""
+        confirmed = self.hits >= self.min_hits
+        states = self.states[confirmed]
+        speeds = np.hypot(states[:, 4], states[:, 5]) / np.maximum(states[:, 3], 1.0)
+        
+        # Rates over the window, or over the time observed so far when that is shorter
+        observed = 0.0 if self.last_time is None else self.last_time - self.first_time
+        per_minute = 60.0 / max(min(self.rate_window, observed), 1.0)
+        return {
+            'vehicles': int(len(states)),
+            'queued': int(np.count_nonzero(speeds < self.stopped_speed)),
+            'arrival_rate': len(self.arrivals) * per_minute,
+            'discharge_rate': len(self.discharges) * per_minute
+        }
+    
+    def demand(self, horizon):
+        """Vehicles expected to need green over the next horizon seconds: present plus arriving"""
+        flow = self.flow()
+        return flow['vehicles'] + flow['arrival_rate'] * horizon / 60.0
\ No newline at end of file
@@ -0,0 +1,234 @@
+import sys
+import time
+import cv2
+
+from vehicle_tracker import VehicleTracker
+
+class FrameSource:
+    """Sampled frames from a video file or stream (RTSP/HTTP URL or local capture index)"""
+    
+    def __init__(self, source, sample_fps=2.0):
+        # Capture indices may arrive as strings from the command line
+        if isinstance(source, str) and source.isdigit():
+            source = int(source)
+        self.source = source
+        self.sample_fps = sample_fps
+        self.capture = cv2.VideoCapture(source)
+        if not self.capture.isOpened():
+            raise ValueError(f"Could not open video source: {source}")
+        
+        # Files are sampled by frame index, live streams by wall-clock time
+        self.is_live = isinstance(source, int) or '://' in str(source)
+        fps = self.capture.get(cv2.CAP_PROP_FPS) or 0
+        self.frame_step = max(1, round(fps / sample_fps)) if fps > 0 else 1
+        self._last_sample = 0.0
+    
+    def read(self):
+        """Return (timestamp_seconds, frame) for the next sampled frame, or None when finished
+        
+        Files are stamped with their position in the video; live sources with time.monotonic(),
+        since some capture backends (e.g. V4L2) report buffer times measured from boot.
+        """
+        if self.is_live:
+            # Drain frames without decoding until the sampling interval has passed
+            while True:
+                if not self.capture.grab():
+                    return None
+                now = time.monotonic()
+                if now - self._last_sample >= 1.0 / self.sample_fps:
+                    self._last_sample = now
+                    break
+        else:
+            # grab() skips frames without the cost of decoding them
+            for _ in range(self.frame_step - 1):
+                if not self.capture.grab():
+                    return None
+            if not self.capture.grab():
+                return None
+        
+        ok, frame = self.capture.retrieve()
+        if not ok:
+            return None
+        if self.is_live:
+            return self._last_sample, frame
+        return self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, frame
+    
+    def __iter__(self):
+        while True:
+            sample = self.read()
+            if sample is None:
+                return
+            yield sample
+    
+    def close(self):
+        self.capture.release()
+
+class MotionGate:
+    """Decides whether a frame changed enough since the last inferred frame to re-run YOLO
+    
+    A frame counts as changed when enough of its pixels changed, so one car entering a
+    large static scene is not averaged away. After max_interval seconds without
+    inference YOLO runs anyway, so slow drift and lighting changes cannot freeze a count.
+    """
+    
+    def __init__(self, threshold=0.01, pixel_threshold=25, max_interval=30.0, size=(160, 90)):
+        # Fraction of pixels whose grey level (0-255) moved by more than pixel_threshold
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.max_interval = max_interval
+        self.size = size
+        self.last_small = None
+        self.last_time = None
+        self.last_count = 0
+    
+    def _small(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    
+    def needs_inference(self, frame, timestamp):
+        if self.last_small is None:
+            return True
+        if self.max_interval is not None and timestamp - self.last_time >= self.max_interval:
+            return True
+        changed = cv2.absdiff(self._small(frame), self.last_small) > self.pixel_threshold
+        return changed.mean() >= self.threshold
+    
+    def update(self, frame, count, timestamp):
+        self.last_small = self._small(frame)
+        self.last_time = timestamp
+        self.last_count = count
+
+class VideoIngest:
+    """Per-camera video sources feeding motion-gated vehicle counts to the signal controller
+    
+    With track_every=N, each camera instead runs a VehicleTracker: YOLO sees every Nth
+    sampled frame, the tracker predicts the frames between, and signal cycles are planned
+    from tracked demand (vehicles present plus arrivals expected during the cycle).
+    """
+    
+    def __init__(self, detector, sources, sample_fps=2.0, motion_threshold=0.01, max_interval=30.0,
+                 track_every=None):
+        self.detector = detector
+        self.sources = {camera: FrameSource(source, sample_fps) for camera, source in sources.items()}
+        self.gates = {camera: MotionGate(motion_threshold, max_interval=max_interval) for camera in sources}
+        self.track_every = track_every
+        self.trackers = {camera: VehicleTracker() for camera in sources} if track_every else {}
+        self.samples = {camera: 0 for camera in sources}
+        self.finished = set()
+        self.inferred = 0
+        self.skipped = 0
+        self.video_time = 0.0
+    
+    def read_counts(self):
+        """Read one sample per camera and return camera_counts, or None once every source ended"""
+        to_infer = []
+        for camera, source in self.sources.items():
+            if camera in self.finished:
+                continue
+            sample = source.read()
+            if sample is None:
+                self.finished.add(camera)
+                print(f"📼 {camera}: source finished, keeping last count")
+                continue
+            
+            timestamp, frame = sample
+            self.video_time = max(self.video_time, timestamp)
+            index = self.samples[camera]
+            self.samples[camera] += 1
+            
+            if self.trackers:
+                if index % self.track_every == 0:
+                    to_infer.append((camera, timestamp, frame))
+                else:
+                    self.trackers[camera].predict(timestamp)
+                    self.skipped += 1
+            elif self.gates[camera].needs_inference(frame, timestamp):
+                to_infer.append((camera, timestamp, frame))
+            else:
+                self.skipped += 1
+        
+        if len(self.finished) == len(self.sources):
+            return None
+        
+        # Cameras due for inference share one batched call
+        frames = [frame for _, _, frame in to_infer]
+        if to_infer and self.trackers:
+            # The tracker's second association stage needs the low-confidence boxes too
+            conf = min(tracker.low_conf for tracker in self.trackers.values())
+            all_boxes = self.detector.detect_boxes(frames, batch_size=len(frames), conf=conf)
+            for (camera, timestamp, _), boxes in zip(to_infer, all_boxes):
+                self.trackers[camera].update(boxes, timestamp)
+        elif to_infer:
+            counts = self.detector.detect_many(frames, batch_size=len(frames))
+            for (camera, timestamp, frame), count in zip(to_infer, counts):
+                self.gates[camera].update(frame, count, timestamp)
+        self.inferred += len(to_infer)
+        
+        if self.trackers:
+            return {camera: len(tracker) for camera, tracker in self.trackers.items()}
+        return {camera: gate.last_count for camera, gate in self.gates.items()}
+    
+    def flow_rates(self):
+        """Per-camera tracked vehicles, queued vehicles and arrival/discharge rates (tracking only)"""
+        return {camera: tracker.flow() for camera, tracker in self.trackers.items()}
+    
+    def demand(self, horizon):
+        """Per-camera vehicles expected to need green within horizon seconds (tracking only)"""
+        return {camera: round(tracker.demand(horizon)) for camera, tracker in self.trackers.items()}
+    
+    def run(self, controller, cycles=None):
+        """Plan signal cycles from the videos, reading frames up to the end of each cycle"""
+        camera_counts = self.read_counts()
+        # Cycles are laid out from the first sample, whatever clock the sources use
+        cycle_end = self.video_time
+        completed = 0
+        
+        while camera_counts is not None and (cycles is None or completed < cycles):
+            if self.trackers:
+                # Plan for the traffic that will arrive during the cycle, not just a snapshot
+                camera_counts = self.demand(controller.total_cycle_time)
+            cycle_info = controller.simulate_signal_cycle(camera_counts)
+            cycle_end += cycle_info['total_cycle_time']
+            completed += 1
+            
+            # Consume video until the cycle finishes; the latest counts plan the next one
+            while camera_counts is not None and self.video_time < cycle_end:
+                latest = self.read_counts()
+                if latest is None:
+                    break
+                camera_counts = latest
+            if self.video_time < cycle_end:
+                break
+        
+        total = self.inferred + self.skipped
+        if total:
+            reason = f"predicted by tracker, YOLO every {self.track_every}" if self.trackers else "skipped by motion gate"
+            print(f"\n🎞️  Inference ran on {self.inferred}/{total} sampled frames "
+                  f"({self.skipped} {reason})")
+        for camera, flow in self.flow_rates().items():
+            print(f"   {camera}: {flow['vehicles']} tracked ({flow['queued']} queued), "
+                  f"arrivals {flow['arrival_rate']:.1f}/min, discharges {flow['discharge_rate']:.1f}/min")
+        return completed
+    
+    def close(self):
+        for source in self.sources.values():
+            source.close()
+
+# Example: python src/video_ingest.py camera_1=north.mp4 camera_2=rtsp://127.0.0.1:8554/east
+# Add --track-every=3 to track vehicles and run YOLO on every third sampled frame
+if __name__ == "__main__":
+    from signal_controller import TrafficSignalController
+    from vehicle_detector import VehicleDetector
+    
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--track-every=')]
+    track_every = next((int(arg.split('=', 1)[1]) for arg in sys.argv[1:] if arg.startswith('--track-every=')), None)
+    if not args:
+        print("Usage: python src/video_ingest.py [--track-every=N] camera_1=<video or stream> [camera_2=...]")
+        sys.exit(1)
+    
+    sources = dict(arg.split('=', 1) for arg in args)
+    ingest = VideoIngest(VehicleDetector(), sources, track_every=track_every)
+    try:
+        ingest.run(TrafficSignalController())
+    finally:
+        ingest.close()
\ No newline at end of file